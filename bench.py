@@ -0,0 +1,484 @@
+"""
+End-to-end throughput benchmark for the validator service, built on
+client.py (same BASE_URL / TIMEOUT and contract-id threading).
+
+Scenarios (mixed with --mix, e.g. deal=2,offer=1,read=1):
+  deal   /create_deal -> /buyer_confirm -> /seller_confirm -> /release
+  offer  /offer_create -> /offer_accept -> /buyer_confirm -> /seller_confirm
+         -> /release
+  read   /deals/<party>, /escrow/<party>, /cash/<party>, /offers/<seller>
+         (first page of each, limit=50)
+
+Load: --concurrency workers run scenarios back to back (closed loop), or
+with --rate N scenarios are started N times per second (open loop,
+--arrival fixed|poisson) on at most --concurrency workers.
+
+Prints a JSON report (throughput, p50/p95/p99 latency and error breakdown
+per endpoint). With --baseline, latency / throughput / error-rate
+regressions beyond the tolerances are listed and the exit code is 1.
+
+The deal and offer scenarios grow the ledger, and list endpoints that are
+not served from the ACS store query every active contract, so record and
+compare baselines against a freshly started ledger. Run against the
+stand-ins (server/mock_ledger.py, server/local_eth.py), restarting
+mock_ledger.py before each run:
+  python bench.py --duration 30 --concurrency 16 --save-baseline bench-baseline.json
+  python bench.py --duration 30 --concurrency 16 --baseline bench-baseline.json
+"""
+
+import argparse
+import json
+import math
+import random
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+import client
+
+
+class Recorder:
+    """Thread-safe per-endpoint latency / error samples."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)  # endpoint -> [seconds] (successes)
+        self.errors = defaultdict(Counter)  # endpoint -> {"HTTP 500": n, ...}
+        self.flows = Counter()  # "<scenario> ok" / "<scenario> failed"
+        self.flow_errors = defaultdict(
+            Counter
+        )  # scenario -> {"unexpected response (...)": n}
+        self.flow_latencies = defaultdict(list)
+        self.start_lag = []  # open loop: scheduled start -> actual start
+
+    def request(self, endpoint, elapsed, error=None):
+        with self.lock:
+            if error:
+                self.errors[endpoint][error] += 1
+            else:
+                self.latencies[endpoint].append(elapsed)
+
+    def flow(self, scenario, elapsed, ok, error=None):
+        with self.lock:
+            self.flows[f"{scenario} {'ok' if ok else 'failed'}"] += 1
+            if ok:
+                self.flow_latencies[scenario].append(elapsed)
+            if error:
+                self.flow_errors[scenario][error] += 1
+
+
+class StepFailed(Exception):
+    pass
+
+
+_local = threading.local()
+
+
+def session():
+    """One keep-alive session per worker thread."""
+    if not hasattr(_local, "session"):
+        _local.session = requests.Session()
+    return _local.session
+
+
+def call(rec, method, endpoint, path, payload=None):
+    """
+    Time one request; endpoint is the path template used as the report key.
+    Returns the response (with a JSON body), raises StepFailed on any error.
+    """
+    t0 = time.perf_counter()
+    try:
+        r = session().request(
+            method, f"{client.BASE_URL}{path}", json=payload, timeout=client.TIMEOUT
+        )
+    except requests.RequestException as e:
+        rec.request(endpoint, time.perf_counter() - t0, type(e).__name__)
+        raise StepFailed(endpoint)
+    elapsed = time.perf_counter() - t0
+    if r.status_code >= 400:
+        rec.request(endpoint, elapsed, f"HTTP {r.status_code}")
+        raise StepFailed(endpoint)
+    try:
+        r.json()
+    except ValueError:
+        rec.request(endpoint, elapsed, "invalid JSON")
+        raise StepFailed(endpoint)
+    rec.request(endpoint, elapsed)
+    return r
+
+
+# =====================================
+# Scenarios
+# =====================================
+
+
+def _exercise_result(r):
+    """client.exercise_result, failing the flow when the choice returned nothing."""
+    cid = client.exercise_result(r)
+    if cid is None:
+        raise KeyError("exerciseResult")
+    return cid
+
+
+def _confirm_and_release(rec, cfg, escrow_cid):
+    pending_cid = _exercise_result(
+        call(
+            rec,
+            "POST",
+            "POST /buyer_confirm",
+            "/buyer_confirm",
+            {"buyer": cfg.buyer, "escrow_cid": escrow_cid},
+        )
+    )
+    ready_cid = _exercise_result(
+        call(
+            rec,
+            "POST",
+            "POST /seller_confirm",
+            "/seller_confirm",
+            {"seller": cfg.seller, "pending_cid": pending_cid},
+        )
+    )
+    payload = {"agent": cfg.agent, "ready_cid": ready_cid}
+    if cfg.buyer_eth and cfg.seller_eth:
+        payload["escrow_cid"] = escrow_cid  # also queue the Ethereum release
+    call(rec, "POST", "POST /release", "/release", payload)
+
+
+def deal_flow(rec, cfg):
+    payload = {
+        "buyer": cfg.buyer,
+        "seller": cfg.seller,
+        "item": "Bench",
+        "price": round(random.uniform(1, 500), 2),
+    }
+    if cfg.buyer_eth and cfg.seller_eth:
+        payload.update(buyer_eth=cfg.buyer_eth, seller_eth=cfg.seller_eth)
+    r = call(rec, "POST", "POST /create_deal", "/create_deal", payload)
+    _confirm_and_release(rec, cfg, r.json()["escrow"]["result"]["contractId"])
+
+
+def offer_flow(rec, cfg):
+    r = call(
+        rec,
+        "POST",
+        "POST /offer_create",
+        "/offer_create",
+        {
+            "buyer": cfg.buyer,
+            "seller": cfg.seller,
+            "cc_amount": random.randint(1, 1000),
+            "unit_price": 0.16,
+            # required by /offer_create; only mirrored on-chain when configured
+            "buyer_eth": cfg.buyer_eth or "0x" + "00" * 20,
+            "seller_eth": cfg.seller_eth or "0x" + "00" * 20,
+        },
+    )
+    offer_cid = r.json()["offer"]["result"]["contractId"]
+    r = call(
+        rec, "POST", "POST /offer_accept", "/offer_accept", {"offer_cid": offer_cid}
+    )
+    _confirm_and_release(rec, cfg, r.json()["escrow"]["result"]["contractId"])
+
+
+def read_flow(rec, cfg):
+    party = random.choice((cfg.buyer, cfg.seller))
+    call(rec, "GET", "GET /deals/<party>", f"/deals/{party}?limit=50")
+    call(rec, "GET", "GET /escrow/<party>", f"/escrow/{cfg.buyer}?limit=50")
+    call(rec, "GET", "GET /cash/<party>", f"/cash/{party}?limit=50")
+    call(rec, "GET", "GET /offers/<seller>", f"/offers/{cfg.seller}?limit=50")
+
+
+SCENARIOS = {"deal": deal_flow, "offer": offer_flow, "read": read_flow}
+
+
+def run_flow(rec, cfg, scenario, scheduled=None):
+    t0 = time.perf_counter()
+    if scheduled is not None:
+        with rec.lock:
+            rec.start_lag.append(t0 - scheduled)
+    error = None
+    try:
+        SCENARIOS[scenario](rec, cfg)
+        ok = True
+    except StepFailed:
+        ok = False  # the failing request is already recorded
+    except (KeyError, TypeError) as e:
+        # a 2xx response without the expected fields
+        ok, error = False, f"unexpected response ({type(e).__name__}: {e})"
+    rec.flow(scenario, time.perf_counter() - t0, ok, error)
+
+
+# =====================================
+# Load generation
+# =====================================
+
+
+def parse_mix(spec):
+    """'deal=2,read=1' -> (["deal", "read"], [2.0, 1.0])"""
+    names, weights = [], []
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise argparse.ArgumentTypeError(f"unknown scenario {name!r}")
+        names.append(name)
+        weights.append(float(weight or 1))
+    return names, weights
+
+
+def closed_loop(rec, cfg, deadline):
+    """Each worker runs scenarios back to back until the deadline / budget."""
+    budget = [cfg.flows]  # remaining flows (None = unlimited)
+    lock = threading.Lock()
+
+    def worker():
+        while time.perf_counter() < deadline:
+            with lock:
+                if budget[0] is not None:
+                    if budget[0] <= 0:
+                        return
+                    budget[0] -= 1
+            run_flow(rec, cfg, random.choices(*cfg.mix)[0])
+
+    threads = [threading.Thread(target=worker) for _ in range(cfg.concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+
+def open_loop(rec, cfg, deadline):
+    """Start scenarios at cfg.rate per second regardless of completions."""
+    started = 0
+    next_at = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=cfg.concurrency) as pool:
+        while next_at < deadline and (cfg.flows is None or started < cfg.flows):
+            delay = next_at - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            pool.submit(run_flow, rec, cfg, random.choices(*cfg.mix)[0], next_at)
+            started += 1
+            gap = 1.0 / cfg.rate
+            next_at += random.expovariate(cfg.rate) if cfg.arrival == "poisson" else gap
+
+
+# =====================================
+# Report / baseline
+# =====================================
+
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    k = max(0, math.ceil(p * len(sorted_values) / 100) - 1)
+    return sorted_values[k]
+
+
+def _ms(seconds):
+    return round(seconds * 1000, 2) if seconds is not None else None
+
+
+def latency_stats(values):
+    values = sorted(values)
+    return {
+        "p50_ms": _ms(percentile(values, 50)),
+        "p95_ms": _ms(percentile(values, 95)),
+        "p99_ms": _ms(percentile(values, 99)),
+        "mean_ms": _ms(sum(values) / len(values)) if values else None,
+        "max_ms": _ms(values[-1]) if values else None,
+    }
+
+
+def build_report(rec, cfg, wall):
+    endpoints = {}
+    for ep in sorted(set(rec.latencies) | set(rec.errors)):
+        ok = len(rec.latencies[ep])
+        errors = sum(rec.errors[ep].values())
+        endpoints[ep] = {
+            "requests": ok + errors,
+            "errors": errors,
+            "error_rate": round(errors / (ok + errors), 4),
+            "error_breakdown": dict(rec.errors[ep]),
+            "throughput_rps": round(ok / wall, 2),
+            **latency_stats(rec.latencies[ep]),
+        }
+
+    flows = {}
+    for name in SCENARIOS:
+        ok, failed = rec.flows[f"{name} ok"], rec.flows[f"{name} failed"]
+        if ok or failed:
+            flows[name] = {
+                "completed": ok,
+                "failed": failed,
+                "failure_rate": round(failed / (ok + failed), 4),
+                "error_breakdown": dict(rec.flow_errors[name]),
+                "throughput_per_s": round(ok / wall, 2),
+                **latency_stats(rec.flow_latencies[name]),
+            }
+
+    completed = sum(f["completed"] for f in flows.values())
+    report = {
+        "base_url": client.BASE_URL,
+        "config": {
+            "mix": dict(zip(*cfg.mix)),
+            "concurrency": cfg.concurrency,
+            "rate": cfg.rate,
+            "arrival": cfg.arrival if cfg.rate else "closed",
+            "duration_s": cfg.duration,
+            "flows": cfg.flows,
+        },
+        "wall_s": round(wall, 2),
+        "throughput_flows_per_s": round(completed / wall, 2),
+        "flows": flows,
+        "endpoints": endpoints,
+    }
+    if rec.start_lag:
+        report["start_lag"] = latency_stats(rec.start_lag)
+    return report
+
+
+def compare(report, baseline, cfg):
+    """Regressions of report against baseline (both build_report() dicts)."""
+    regressions = []
+
+    if baseline.get("config") != report["config"]:
+        print(
+            "warning: baseline was recorded with a different load config,"
+            " throughput is not comparable",
+            file=sys.stderr,
+        )
+
+    base_tp = baseline.get("throughput_flows_per_s") or 0
+    cur_tp = report["throughput_flows_per_s"]
+    if base_tp and cur_tp < base_tp * (1 - cfg.tolerance):
+        regressions.append(
+            {"metric": "throughput_flows_per_s", "baseline": base_tp, "current": cur_tp}
+        )
+
+    for name, base in baseline.get("flows", {}).items():
+        cur = report["flows"].get(name)
+        if cur is None:
+            continue
+        b, c = base.get("failure_rate", 0), cur["failure_rate"]
+        if c > b + cfg.error_tolerance:
+            regressions.append(
+                {"flow": name, "metric": "failure_rate", "baseline": b, "current": c}
+            )
+
+    for ep, base in baseline.get("endpoints", {}).items():
+        cur = report["endpoints"].get(ep)
+        # too few samples for stable percentiles / error rates
+        if cur is None or min(cur["requests"], base["requests"]) < cfg.min_requests:
+            continue
+        for key in ("p50_ms", "p95_ms", "p99_ms"):
+            b, c = base.get(key), cur.get(key)
+            if b is None or c is None:
+                continue
+            if c > b * (1 + cfg.tolerance) and c - b > cfg.min_delta_ms:
+                regressions.append(
+                    {"endpoint": ep, "metric": key, "baseline": b, "current": c}
+                )
+        b, c = base.get("error_rate", 0), cur["error_rate"]
+        if c > b + cfg.error_tolerance:
+            regressions.append(
+                {"endpoint": ep, "metric": "error_rate", "baseline": b, "current": c}
+            )
+    return regressions
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Validator service benchmark")
+    ap.add_argument("--base-url", default=client.BASE_URL)
+    ap.add_argument(
+        "--mix",
+        type=parse_mix,
+        default="deal=1",
+        help="weighted scenarios, e.g. deal=2,offer=1,read=1",
+    )
+    ap.add_argument("--concurrency", type=int, default=8)
+    ap.add_argument(
+        "--rate",
+        type=float,
+        default=0,
+        help="scenarios started per second (0 = closed loop)",
+    )
+    ap.add_argument("--arrival", choices=("fixed", "poisson"), default="poisson")
+    ap.add_argument("--duration", type=float, default=30, help="seconds")
+    ap.add_argument("--flows", type=int, help="stop after this many scenarios")
+    ap.add_argument("--warmup", type=int, default=2, help="unrecorded scenarios")
+    ap.add_argument("--buyer", default="Alice-1")
+    ap.add_argument("--seller", default="Bob-1")
+    ap.add_argument("--agent", default="Escrow-1")
+    ap.add_argument("--buyer-eth", help="mirror deals on Ethereum (with --seller-eth)")
+    ap.add_argument("--seller-eth")
+    ap.add_argument("--out", help="also write the report to this file")
+    ap.add_argument("--baseline", help="report to compare against")
+    ap.add_argument("--save-baseline", help="write the report as the new baseline")
+    ap.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="allowed relative latency increase / throughput drop",
+    )
+    ap.add_argument(
+        "--min-delta-ms",
+        type=float,
+        default=5,
+        help="ignore latency increases smaller than this",
+    )
+    ap.add_argument(
+        "--min-requests",
+        type=int,
+        default=20,
+        help="skip endpoints with fewer samples in either run",
+    )
+    ap.add_argument(
+        "--error-tolerance",
+        type=float,
+        default=0.01,
+        help="allowed absolute error-rate increase",
+    )
+    cfg = ap.parse_args()
+    client.BASE_URL = cfg.base_url.rstrip("/")
+
+    for _ in range(cfg.warmup):
+        run_flow(Recorder(), cfg, random.choices(*cfg.mix)[0])
+
+    rec = Recorder()
+    t0 = time.perf_counter()
+    deadline = t0 + cfg.duration
+    if cfg.rate > 0:
+        open_loop(rec, cfg, deadline)
+    else:
+        closed_loop(rec, cfg, deadline)
+    report = build_report(rec, cfg, time.perf_counter() - t0)
+
+    regressions = []
+    if cfg.baseline:
+        with open(cfg.baseline) as f:
+            regressions = compare(report, json.load(f), cfg)
+        report["baseline"] = cfg.baseline
+        report["regressions"] = regressions
+
+    out = json.dumps(report, indent=2)
+    print(out)
+    for path in (cfg.out, cfg.save_baseline):
+        if path:
+            with open(path, "w") as f:
+                f.write(out + "\n")
+
+    if regressions:
+        print(
+            f"{len(regressions)} regression(s) against {cfg.baseline}", file=sys.stderr
+        )
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
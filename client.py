@@ -33,9 +33,11 @@ def deals_for(party):
     return r
 
 
-def buyer_confirm(buyer="Alice-1"):
+def buyer_confirm(buyer="Alice-1", escrow_cid=None):
     url = f"{BASE_URL}/buyer_confirm"
     payload = {"buyer": buyer}
+    if escrow_cid:
+        payload["escrow_cid"] = escrow_cid
     r = requests.post(url, json=payload, timeout=TIMEOUT)
     print("== buyer_confirm ==")
     print("status:", r.status_code)
@@ -44,9 +46,11 @@ def buyer_confirm(buyer="Alice-1"):
     return r
 
 
-def seller_confirm(seller="Bob-1"):
+def seller_confirm(seller="Bob-1", pending_cid=None):
     url = f"{BASE_URL}/seller_confirm"
     payload = {"seller": seller}
+    if pending_cid:
+        payload["pending_cid"] = pending_cid
     r = requests.post(url, json=payload, timeout=TIMEOUT)
     print("== seller_confirm ==")
     print("status:", r.status_code)
@@ -55,9 +59,13 @@ def seller_confirm(seller="Bob-1"):
     return r
 
 
-def release(agent="Escrow-1"):
+def release(agent="Escrow-1", ready_cid=None, escrow_cid=None):
     url = f"{BASE_URL}/release"
     payload = {"agent": agent}
+    if ready_cid:
+        payload["ready_cid"] = ready_cid
+    if escrow_cid:
+        payload["escrow_cid"] = escrow_cid
     r = requests.post(url, json=payload, timeout=TIMEOUT)
     print("== release ==")
     print("status:", r.status_code)
@@ -66,9 +74,13 @@ def release(agent="Escrow-1"):
     return r
 
 
-def refund(agent="Escrow-1"):
+def refund(agent="Escrow-1", ready_cid=None, escrow_cid=None):
     url = f"{BASE_URL}/refund"
     payload = {"agent": agent}
+    if ready_cid:
+        payload["ready_cid"] = ready_cid
+    if escrow_cid:
+        payload["escrow_cid"] = escrow_cid
     r = requests.post(url, json=payload, timeout=TIMEOUT)
     print("== refund ==")
     print("status:", r.status_code)
@@ -110,6 +122,14 @@ def deal_summary():
     return r
 
 
+def exercise_result(r):
+    """Contract id returned by a choice (None if the call failed)."""
+    try:
+        return r.json()["result"]["exerciseResult"]
+    except Exception:
+        return None
+
+
 def main():
     # 1. Check API status
     print("== status ==")
@@ -118,19 +138,23 @@ def main():
     print()
 
     # 2. Create a new deal between buyer and seller
-    create_deal(buyer="Alice-1", seller="Bob-1", item="Phone", price=200.0)
+    deal = create_deal(buyer="Alice-1", seller="Bob-1", item="Phone", price=200.0)
+    try:
+        escrow_cid = deal.json()["escrow"]["result"]["contractId"]
+    except Exception:
+        escrow_cid = None
 
     # 3. View current Escrow state from buyer's perspective
     escrow_for("Alice-1")
 
     # 4. Buyer confirms the deal
-    buyer_confirm("Alice-1")
+    pending_cid = exercise_result(buyer_confirm("Alice-1", escrow_cid))
 
     # 5. Seller confirms the deal
-    seller_confirm("Bob-1")
+    ready_cid = exercise_result(seller_confirm("Bob-1", pending_cid))
 
     # 6. Escrow agent releases the funds
-    release("Escrow-1")
+    release("Escrow-1", ready_cid)
 
     # 7. Display updated cash balances
     cash("Alice-1")
@@ -1,14 +1,40 @@
 import os
 import json
+import re
+import bisect
+import heapq
 import base64
+import hashlib
+import hmac
+import io
+import sqlite3
 import subprocess
+import uuid
+import zipfile
 from pathlib import Path
 from web3 import Web3
 import threading
 import time
+import queue
+import zlib
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import wraps
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeout
+from itertools import islice
 
 import requests
-from flask import Flask, request, jsonify, render_template
+import websocket  # websocket-client, for /v1/stream/query
+from requests.adapters import HTTPAdapter
+from flask import (
+    Flask,
+    Response,
+    request,
+    jsonify,
+    render_template,
+    stream_with_context,
+)
 
 # =====================================
 # CONFIG
@@ -19,8 +45,22 @@ API_URL = os.environ.get("DAML_API_URL", "http://localhost:7576/v1")
 BASE_URL = API_URL.replace("/v1", "")
 
 APPLICATION_ID = os.environ.get("DAML_APP_ID", "flask-app")
+
+# Use this packageId instead of reading it from the local DAR (e.g. against
+# server/mock_ledger.py, or when the DAR is not built on this host)
+PACKAGE_ID_OVERRIDE = os.environ.get("DAML_PACKAGE_ID", "")
 LEDGER_ID = os.environ.get("DAML_LEDGER_ID", "participant1")  # Logical ledger id
 
+# JWT signing for the JSON API: "none" (demo), "HS256" (shared secret) or
+# "RS256" (PEM private key, requires PyJWT + cryptography). DAML_JWT_TTL > 0
+# adds an exp claim.
+JWT_ALG = os.environ.get("DAML_JWT_ALG", "none")
+JWT_SECRET = os.environ.get("DAML_JWT_SECRET", "")
+JWT_KEY_FILE = os.environ.get("DAML_JWT_KEY_FILE", "")
+JWT_TTL = int(os.environ.get("DAML_JWT_TTL", "0"))
+JWT_REFRESH_MARGIN = int(os.environ.get("DAML_JWT_REFRESH_MARGIN", "30"))
+JWT_CACHE_MAX = 1024
+
 # Participant1 Ledger gRPC endpoint (used by daml CLI list-parties)
 LEDGER_HOST = os.environ.get("LEDGER_HOST", "localhost")
 LEDGER_PORT = int(os.environ.get("LEDGER_PORT", "5011"))
@@ -39,18 +79,330 @@ if not DAML_CMD:
         DAML_CMD = "daml"
 print("[i] Using daml command:", DAML_CMD)
 
+# HTTP connection pool towards the JSON API (keep-alive, shared by all threads)
+LEDGER_HTTP_POOL_SIZE = int(os.environ.get("LEDGER_HTTP_POOL_SIZE", "32"))
+LEDGER_HTTP_TIMEOUT = float(os.environ.get("LEDGER_HTTP_TIMEOUT", "20"))
+LEDGER_HTTP_READ_RETRIES = int(os.environ.get("LEDGER_HTTP_READ_RETRIES", "2"))
+
+# Concurrent ledger reads for multi-template endpoints (budget in seconds)
+LEDGER_FANOUT_WORKERS = int(os.environ.get("LEDGER_FANOUT_WORKERS", "8"))
+DEALS_QUERY_BUDGET = float(os.environ.get("DEALS_QUERY_BUDGET", "5"))
+
+# /deals/bulk: deals opened in parallel (shared by all bulk requests)
+BULK_DEAL_WORKERS = int(os.environ.get("BULK_DEAL_WORKERS", "16"))
+
+# Party directory refresh (seconds)
+PARTY_REFRESH_INTERVAL = float(os.environ.get("PARTY_REFRESH_INTERVAL", "30"))
+PARTY_NEGATIVE_TTL = float(os.environ.get("PARTY_NEGATIVE_TTL", "10"))
+
+# PartyAlias contracts are read with the admin's rights (Escrow-1 in the demo)
+PARTY_ALIAS_ADMIN = os.environ.get("PARTY_ALIAS_ADMIN", "Escrow-1")
+
+# JSON API websocket endpoint for live queries
+STREAM_URL = API_URL.replace("http://", "ws://").replace("https://", "wss://")
+STREAM_URL = f"{STREAM_URL}/stream/query"
+
+# Local active-contract store (fed by /v1/stream/query). Parties whose view is
+# mirrored; read endpoints fall back to /v1/query while the store is not live.
+ACS_ENABLED = os.environ.get("ACS_ENABLED", "1") == "1"
+ACS_READ_AS = os.environ.get("ACS_READ_AS", "Escrow-1,Bank-1,Alice-1,Bob-1").split(",")
+
+# Mirrored templates and the stakeholder fields each one is indexed by
+ACS_TEMPLATES = {
+    "Token:Cash": ("issuer", "owner"),
+    "Escrow:Escrow": ("agent", "buyer", "seller"),
+    "Escrow:Pending": ("agent", "buyer", "seller"),
+    "Escrow:Ready": ("agent", "buyer", "seller"),
+    "Escrow:Completed": ("agent", "buyer", "seller"),
+    "Escrow:Offer": ("agent", "buyer", "seller"),
+}
+
 app = Flask(__name__)
 
 # Cache for Party identifiers by alias ("Alice-1", "Bob-1", etc.)
 _party_cache: dict[str, str] = {}
+_party_cache_refreshed_at = 0.0
+
+# Negative cache: unknown alias -> time until which it is not looked up again
+_party_misses: dict[str, float] = {}
+_party_refresh_lock = threading.Lock()
+_party_refresher_started = False
+# Last blocking load attempted while the cache was still empty
+_party_cold_load_at = 0.0
+
+# On-ledger aliases from Parties:PartyAlias, kept live by a stream:
+#   alias -> party, and PartyAlias contractId -> (alias, party)
+_alias_index: dict[str, str] = {}
+_alias_by_cid: dict[str, tuple[str, str]] = {}
+_alias_live = False
+_alias_stream_started = False
 
 # Cache for main packageId of the DAR
 _pkg_cache: str | None = None
+_pkg_lock = threading.Lock()
+
+# All templates defined under daml/, as 'Module:Entity'
+TEMPLATES = (
+    "Token:Cash",
+    "Escrow:Escrow",
+    "Escrow:Pending",
+    "Escrow:Ready",
+    "Escrow:Completed",
+    "Escrow:Offer",
+    "Escrow:EscrowFunding",
+    "Parties:PartyAlias",
+)
+
+# 'Module:Entity' -> '<pkg>:Module:Entity' for the current package.
+# Replaced as a whole (never mutated) so readers always see one package.
+_tid_table: dict[str, str] = {}
 _proj_root_cache: Path | None = None
 
 # Mapping between Ethereum dealId and Canton Escrow contractId
-# dealId_hex -> escrow_cid
-deal_map: dict[str, str] = {}
+# (dealId_hex -> escrow_cid) is persisted in the bridge DB, see deal_map_get()
+
+# =====================================
+# Metrics (Prometheus text format, served on /metrics)
+# =====================================
+
+# Latency buckets in seconds (upper bounds, +Inf implied)
+METRICS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+METRICS_HELP = {
+    "ledger_request_seconds": ("histogram", "JSON API request latency"),
+    "ledger_requests_total": ("counter", "JSON API requests by HTTP status"),
+    "ledger_requests_in_flight": ("gauge", "JSON API requests in flight"),
+    "eth_rpc_seconds": ("histogram", "Ethereum JSON-RPC call latency"),
+    "eth_rpc_requests_total": ("counter", "Ethereum JSON-RPC calls by outcome"),
+    "eth_rpc_in_flight": ("gauge", "Ethereum JSON-RPC calls in flight"),
+    "party_refresh_seconds": ("histogram", "Party directory refresh latency"),
+    "package_id_resolve_seconds": ("histogram", "packageId resolution latency"),
+}
+
+# (name, ((label, value), ...)) -> [bucket counts..., +Inf count, sum]
+_histograms: dict[tuple, list] = {}
+# (name, ((label, value), ...)) -> value, for counters and gauges
+_counters: dict[tuple, float] = {}
+_metrics_lock = threading.Lock()
+
+
+def observe(name: str, seconds: float, **labels):
+    """Record one latency sample in histogram name."""
+    key = (name, tuple(sorted(labels.items())))
+    i = bisect.bisect_left(METRICS_BUCKETS, seconds)
+    with _metrics_lock:
+        h = _histograms.get(key)
+        if h is None:
+            h = _histograms[key] = [0] * (len(METRICS_BUCKETS) + 2)
+        h[i] += 1
+        h[-1] += seconds
+
+
+def inc(name: str, value: float = 1, **labels):
+    """Add value to counter (or gauge) name."""
+    key = (name, tuple(sorted(labels.items())))
+    with _metrics_lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def _label_value(v) -> str:
+    return str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _label_str(labels, extra: str = "") -> str:
+    parts = [f'{k}="{_label_value(v)}"' for k, v in labels]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def render_metrics() -> str:
+    """All metrics in the Prometheus text exposition format."""
+    with _metrics_lock:
+        hists = {k: list(v) for k, v in _histograms.items()}
+        counters = dict(_counters)
+
+    lines = []
+    for name, (kind, help_text) in METRICS_HELP.items():
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        if kind == "histogram":
+            for (n, labels), h in sorted(hists.items()):
+                if n != name:
+                    continue
+                cum = 0
+                for bound, count in zip(METRICS_BUCKETS + ("+Inf",), h[:-1]):
+                    cum += count
+                    le = _label_str(labels, f'le="{bound}"')
+                    lines.append(f"{name}_bucket{le} {cum}")
+                lines.append(f"{name}_sum{_label_str(labels)} {h[-1]}")
+                lines.append(f"{name}_count{_label_str(labels)} {cum}")
+        else:
+            for (n, labels), value in sorted(counters.items()):
+                if n == name:
+                    lines.append(f"{name}{_label_str(labels)} {value}")
+    return "\n".join(lines) + "\n"
+
+
+class InstrumentedHTTPProvider(Web3.HTTPProvider):
+    """HTTPProvider that records latency and outcome of every JSON-RPC call."""
+
+    def make_request(self, method, params):
+        inc("eth_rpc_in_flight", 1)
+        t0 = time.perf_counter()
+        outcome = "exception"
+        try:
+            resp = super().make_request(method, params)
+            outcome = "error" if resp.get("error") else "ok"
+            return resp
+        finally:
+            observe("eth_rpc_seconds", time.perf_counter() - t0, method=method)
+            inc("eth_rpc_requests_total", method=method, outcome=outcome)
+            inc("eth_rpc_in_flight", -1)
+
+
+# =====================================
+# Flow tracing (per-request timings + Chrome trace file)
+# =====================================
+
+# Chrome Trace Event file (open in chrome://tracing or Perfetto); off if empty
+TRACE_FILE = os.environ.get("TRACE_FILE", "")
+
+_trace_local = threading.local()
+_trace_queue: queue.Queue = queue.Queue()
+_trace_writer_started = False
+
+
+def trace_writer():
+    """Append queued trace events to TRACE_FILE (JSON array format)."""
+    path = Path(TRACE_FILE)
+    with path.open("a") as f:
+        if f.tell() == 0:
+            # The closing ']' is optional in this format, so events can be
+            # appended for as long as the process runs
+            f.write("[\n")
+        while True:
+            batch = [_trace_queue.get()]
+            while True:
+                try:
+                    batch.append(_trace_queue.get_nowait())
+                except queue.Empty:
+                    break
+            f.write("".join(json.dumps(ev) + ",\n" for ev in batch))
+            f.flush()
+
+
+def start_trace_writer():
+    global _trace_writer_started
+    if _trace_writer_started or not TRACE_FILE:
+        return
+    _trace_writer_started = True
+    threading.Thread(target=trace_writer, daemon=True).start()
+    print(f"[trace] writing trace events to {TRACE_FILE}")
+
+
+def emit_trace_event(name: str, cat: str, start: float, end: float, args: dict):
+    """Queue one complete ('X') event for the trace file, if enabled."""
+    if not TRACE_FILE:
+        return
+    start_trace_writer()
+    _trace_queue.put(
+        {
+            "name": name,
+            "cat": cat,
+            "ph": "X",
+            "ts": int(start * 1e6),
+            "dur": int((end - start) * 1e6),
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+            "args": args,
+        }
+    )
+
+
+@contextmanager
+def trace_flow(name: str, **args):
+    """
+    Collect the spans of one flow (an endpoint or a background job) run on
+    this thread. Yields the flow; see flow_timings().
+    """
+    flow = {"name": name, "start": time.time(), "end": None, "spans": []}
+    outer = getattr(_trace_local, "flow", None)
+    _trace_local.flow = flow
+    try:
+        yield flow
+    finally:
+        _trace_local.flow = outer
+        flow["end"] = time.time()
+        emit_trace_event(name, "flow", flow["start"], flow["end"], args)
+
+
+@contextmanager
+def trace_span(name: str, **args):
+    """Time one step of the current flow (and of the trace file)."""
+    t0 = time.time()
+    try:
+        yield
+    except Exception as e:
+        args["error"] = str(e)
+        raise
+    finally:
+        t1 = time.time()
+        flow = getattr(_trace_local, "flow", None)
+        if flow is not None:
+            flow["spans"].append(
+                {
+                    "name": name,
+                    "start_ms": round((t0 - flow["start"]) * 1000, 2),
+                    "duration_ms": round((t1 - t0) * 1000, 2),
+                    **args,
+                }
+            )
+        emit_trace_event(name, "step", t0, t1, args)
+
+
+def flow_timings(flow: dict) -> dict:
+    """The 'timings' block of a finished flow."""
+    end = flow["end"] or time.time()
+    return {
+        "flow": flow["name"],
+        "total_ms": round((end - flow["start"]) * 1000, 2),
+        "spans": flow["spans"],
+    }
+
+
+def wants_timings() -> bool:
+    """?timings=1, or "timings": true in the JSON body."""
+    if request.args.get("timings") == "1":
+        return True
+    body = request.get_json(silent=True)
+    return isinstance(body, dict) and bool(body.get("timings"))
+
+
+def traced(name: str):
+    """
+    Run an endpoint as a traced flow; when the caller asks for timings, its
+    spans are added to the JSON response as a "timings" block.
+    """
+
+    def decorate(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            with trace_flow(name) as flow:
+                rv = view(*args, **kwargs)
+            if not wants_timings():
+                return rv
+            resp = app.make_response(rv)
+            data = resp.get_json(silent=True)
+            if isinstance(data, dict):
+                data["timings"] = flow_timings(flow)
+                resp.set_data(json.dumps(data))
+            return resp
+
+        return wrapper
+
+    return decorate
+
 
 # =====================================
 # ETHEREUM / SEPOLIA CONFIG (Bridge side)
@@ -71,11 +423,15 @@ SEPOLIA_TOKEN_ADDRESS = os.environ.get(
     "SEPOLIA_TOKEN_ADDRESS", "0x337188FF8fE6BcC7316cC5c4f8202196777a4E64"  # MockUSDT
 )
 
-# Token decimals for the demo stablecoin
-TOKEN_DECIMALS = 6  # mUSDT
+# Expected token decimals for the demo stablecoin; amounts always use the
+# value read on-chain (token_decimals()), a mismatch is only logged
+TOKEN_DECIMALS = int(os.environ.get("TOKEN_DECIMALS", "6"))  # mUSDT
+
+# Chain metadata (broker, token symbol/decimals) refresh interval, seconds
+ETH_META_TTL = float(os.environ.get("ETH_META_TTL", "60"))
 
 # Initialize Web3
-w3 = Web3(Web3.HTTPProvider(ETH_RPC_URL))
+w3 = Web3(InstrumentedHTTPProvider(ETH_RPC_URL))
 
 try:
     SEPOLIA_ESCROW_ADDRESS = Web3.to_checksum_address(SEPOLIA_ESCROW_ADDRESS)
@@ -245,6 +601,13 @@ ESCROW_ABI = [
         "stateMutability": "nonpayable",
         "type": "function",
     },
+    {
+        "inputs": [],
+        "name": "broker",
+        "outputs": [{"internalType": "address", "name": "", "type": "address"}],
+        "stateMutability": "view",
+        "type": "function",
+    },
     {
         "inputs": [
             {"internalType": "bytes32", "name": "dealId", "type": "bytes32"},
@@ -315,8 +678,8 @@ def bridge_create_eth_deal_from_canton(
     buyer = Web3.to_checksum_address(buyer_eth)
     seller = Web3.to_checksum_address(seller_eth)
 
-    # Convert to token units (decimals=6)
-    amount = int(float(price) * (10**TOKEN_DECIMALS))
+    # Convert to token units
+    amount = int(float(price) * (10 ** token_decimals()))
 
     fn = escrow_contract.functions.createDeal(
         deal_id_bytes,
@@ -325,11 +688,12 @@ def bridge_create_eth_deal_from_canton(
         amount,
     )
 
-    tx_hash = send_tx(fn)  # returns hex string (without 0x)
+    with trace_span("eth_create_deal", dealId=deal_id_hex):
+        tx_hash = send_tx(fn)  # returns hex string (without 0x)
 
     # Store mapping between Ethereum dealId and Canton Escrow
     if deal_id_hex and escrow_cid:
-        deal_map[deal_id_hex] = escrow_cid
+        deal_map_put(deal_id_hex, escrow_cid)
 
     return {
         "dealId": deal_id_hex,
@@ -342,100 +706,883 @@ def bridge_create_eth_deal_from_canton(
     }
 
 
-SEPOLIA_CHAIN_ID = 11155111  # Sepolia chain id
+# Chain id used when signing (Sepolia by default; see server/local_eth.py)
+SEPOLIA_CHAIN_ID = int(os.environ.get("ETH_CHAIN_ID", "11155111"))
+
+# Broker transaction pipeline
+ETH_GAS_PRICE_TTL = float(os.environ.get("ETH_GAS_PRICE_TTL", "15"))
+ETH_RECEIPT_POLL = float(os.environ.get("ETH_RECEIPT_POLL", "3"))
+ETH_RECEIPT_TIMEOUT = float(os.environ.get("ETH_RECEIPT_TIMEOUT", "600"))
+ETH_SUBMIT_TIMEOUT = float(os.environ.get("ETH_SUBMIT_TIMEOUT", "60"))
+# Finished entries stay queryable through tx_status() for this long
+ETH_TX_STATUS_TTL = float(os.environ.get("ETH_TX_STATUS_TTL", "3600"))
+
+# Event watcher: confirmation depth, poll interval and eth_getLogs range sizes
+ETH_CONFIRMATIONS = int(os.environ.get("ETH_CONFIRMATIONS", "3"))
+ETH_WATCH_POLL = float(os.environ.get("ETH_WATCH_POLL", "5"))
+ETH_LOG_RANGE_MIN = int(os.environ.get("ETH_LOG_RANGE_MIN", "10"))
+ETH_LOG_RANGE_MAX = int(os.environ.get("ETH_LOG_RANGE_MAX", "5000"))
+ETH_WATCH_START_BLOCK = (
+    int(os.environ["ETH_WATCH_START_BLOCK"])
+    if os.environ.get("ETH_WATCH_START_BLOCK")
+    else None
+)
+
+# (fn, Future) waiting to be signed and broadcast, in submission order
+_tx_queue: queue.Queue = queue.Queue()
+_eth_nonce: int | None = None
+_eth_nonce_lock = threading.Lock()
+_gas_price_cache: tuple[int, float] | None = None
+_tx_pipeline_started = False
+
+# tx hash -> {"status": "pending" | "mined" | "failed" | "timeout", ...}
+_tx_status: dict[str, dict] = {}
+# The receipt watcher only scans _tx_pending; finished hashes are evicted from
+# _tx_status in finishing order once older than ETH_TX_STATUS_TTL
+_tx_pending: dict[str, dict] = {}
+_tx_finished: OrderedDict[str, float] = OrderedDict()
+
+
+class TxOutcomeUnknown(RuntimeError):
+    """send_tx gave up while the transaction was being signed / broadcast."""
+
+
+def _eth_resync_nonce():
+    """Reload the broker nonce from the node (pending block)."""
+    global _eth_nonce
+    with _eth_nonce_lock:
+        _eth_nonce = w3.eth.get_transaction_count(eth_broker_account.address, "pending")
+        print(f"[eth] nonce resynced: {_eth_nonce}")
+
+
+def _eth_gas_price() -> int:
+    """Network gas price + 20%, cached for ETH_GAS_PRICE_TTL seconds."""
+    global _gas_price_cache
+    now = time.time()
+    if _gas_price_cache and now - _gas_price_cache[1] < ETH_GAS_PRICE_TTL:
+        return _gas_price_cache[0]
+    gas_price = int(w3.eth.gas_price * 1.2)
+    _gas_price_cache = (gas_price, now)
+    return gas_price
+
+
+def _sign_and_send(fn) -> str:
+    """Build, sign and broadcast fn with the next local nonce."""
+    global _eth_nonce
+    if _eth_nonce is None:
+        _eth_resync_nonce()
+
+    for attempt in range(3):
+        with _eth_nonce_lock:
+            nonce = _eth_nonce
+        tx = fn.build_transaction(
+            {
+                "from": eth_broker_account.address,
+                "nonce": nonce,
+                "gas": 400000,
+                "gasPrice": _eth_gas_price(),
+                "chainId": SEPOLIA_CHAIN_ID,
+            }
+        )
+        signed = w3.eth.account.sign_transaction(tx, private_key=ETH_BROKER_PRIVATE_KEY)
+        try:
+            tx_hash = w3.eth.send_raw_transaction(signed.raw_transaction)
+        except Exception as e:
+            msg = str(e).lower()
+            if "already known" in msg:
+                # This exact transaction is already in the mempool: keep its
+                # hash rather than re-signing the operation with a new nonce
+                print(f"[eth] {signed.hash.hex()} already known (nonce {nonce})")
+                tx_hash = signed.hash
+            else:
+                stale_nonce = "nonce" in msg and ("too low" in msg or "invalid" in msg)
+                if attempt < 2 and stale_nonce:
+                    print(f"[eth] nonce {nonce} rejected ({e}), resyncing")
+                    _eth_resync_nonce()
+                    continue
+                raise
+
+        with _eth_nonce_lock:
+            if _eth_nonce == nonce:
+                _eth_nonce = nonce + 1
+        tx_hash_hex = tx_hash.hex()
+        st = {"status": "pending", "nonce": nonce, "sent_at": time.time()}
+        _tx_status[tx_hash_hex] = st
+        _tx_pending[tx_hash_hex] = st
+        print(f"[eth] sent: {tx_hash_hex} (nonce {nonce})")
+        return tx_hash_hex
+
+
+def tx_submitter():
+    """Sign and broadcast queued transactions back to back, without waiting for receipts."""
+    while True:
+        fn, fut = _tx_queue.get()
+        if not fut.set_running_or_notify_cancel():
+            continue
+        try:
+            fut.set_result(_sign_and_send(fn))
+        except Exception as e:
+            print(f"[eth] send_tx error: {e}")
+            fut.set_exception(e)
+
+
+def _tx_finish(tx_hash: str, now: float):
+    _tx_pending.pop(tx_hash, None)
+    _tx_finished[tx_hash] = now
+
+
+def receipt_watcher():
+    """Confirm receipts of broadcast transactions asynchronously."""
+    while True:
+        time.sleep(ETH_RECEIPT_POLL)
+        now = time.time()
+        while _tx_finished:
+            tx_hash, finished_at = next(iter(_tx_finished.items()))
+            if now - finished_at <= ETH_TX_STATUS_TTL:
+                break
+            del _tx_finished[tx_hash]
+            _tx_status.pop(tx_hash, None)
+
+        for tx_hash, st in list(_tx_pending.items()):
+            try:
+                receipt = w3.eth.get_transaction_receipt(tx_hash)
+            except Exception:
+                receipt = None
+            if receipt is not None:
+                st["status"] = "mined" if receipt.status == 1 else "failed"
+                st["block"] = receipt.blockNumber
+                _tx_finish(tx_hash, now)
+                emit_trace_event(
+                    "receipt_wait",
+                    "step",
+                    st["sent_at"],
+                    now,
+                    {"tx_hash": tx_hash, "status": st["status"]},
+                )
+                print(f"[eth] {tx_hash} {st['status']} in block {receipt.blockNumber}")
+            elif now - st["sent_at"] > ETH_RECEIPT_TIMEOUT:
+                st["status"] = "timeout"
+                _tx_finish(tx_hash, now)
+                print(f"[eth] {tx_hash} not mined after {ETH_RECEIPT_TIMEOUT}s")
+                try:
+                    _eth_resync_nonce()
+                except Exception as e:
+                    print("[eth] nonce resync failed:", e)
+
+
+def start_tx_pipeline():
+    """Start the submitter and receipt watcher threads (once per process)."""
+    global _tx_pipeline_started
+    if _tx_pipeline_started:
+        return
+    _tx_pipeline_started = True
+    threading.Thread(target=tx_submitter, daemon=True).start()
+    threading.Thread(target=receipt_watcher, daemon=True).start()
+    print("[eth] tx submitter + receipt watcher started")
+
+
+def submit_tx(fn) -> Future:
+    """Queue a contract call for signing/broadcast; the Future yields the tx hash."""
+    if not eth_broker_account:
+        raise RuntimeError("ETH_BROKER_PRIVATE_KEY not configured")
+    start_tx_pipeline()
+    fut: Future = Future()
+    _tx_queue.put((fn, fut))
+    return fut
 
 
 def send_tx(fn):
     """
-    Send a signed Ethereum transaction with basic nonce/gas handling.
-    Returns the transaction hash as a hex string.
+    Send a signed Ethereum transaction through the broker pipeline.
+    Returns the transaction hash as a hex string once it is broadcast (the
+    receipt is confirmed in the background, see tx_status), or None if it was
+    not broadcast. Raises TxOutcomeUnknown when it may still have been
+    broadcast: the caller must not resend the same operation blindly.
     """
     if not eth_broker_account:
         raise RuntimeError("ETH_BROKER_PRIVATE_KEY not configured")
 
-    from_addr = eth_broker_account.address
+    fut = submit_tx(fn)
+    try:
+        return fut.result(timeout=ETH_SUBMIT_TIMEOUT)
+    except FutureTimeout:
+        if fut.cancel():
+            print(f"[eth] send_tx: still queued after {ETH_SUBMIT_TIMEOUT}s, cancelled")
+            return None
+    except Exception as e:
+        print(f"[eth] send_tx error: {e}")
+        return None
+
+    # Already being signed / broadcast: give that one RPC call time to finish
+    try:
+        return fut.result(timeout=ETH_SUBMIT_TIMEOUT)
+    except FutureTimeout:
+        raise TxOutcomeUnknown(
+            f"transaction not confirmed as broadcast after {2 * ETH_SUBMIT_TIMEOUT}s"
+        )
+    except Exception as e:
+        print(f"[eth] send_tx error: {e}")
+        return None
+
 
-    # Use pending nonce to avoid collisions
-    nonce = w3.eth.get_transaction_count(from_addr, "pending")
+def tx_status(tx_hash: str) -> dict | None:
+    """Receipt status of a transaction sent by this process."""
+    h = tx_hash.removeprefix("0x")
+    return _tx_status.get(h) or _tx_status.get(f"0x{h}")
 
-    # Slightly bump gas price (20%) over the current network value
-    base_gas_price = w3.eth.gas_price
-    gas_price = int(base_gas_price * 1.2)
 
-    tx = fn.build_transaction(
-        {
-            "from": from_addr,
-            "nonce": nonce,
-            "gas": 400000,
-            "gasPrice": gas_price,
-            "chainId": SEPOLIA_CHAIN_ID,
+# =====================================
+# Ethereum: chain metadata cache
+# =====================================
+
+# Refreshed in the background every ETH_META_TTL seconds; /eth/status and
+# token_decimals() answer from here without touching the RPC node.
+_eth_meta: dict = {}
+_eth_meta_lock = threading.Lock()
+_eth_meta_started = False
+
+
+def refresh_eth_meta() -> bool:
+    """Read broker / token metadata from the chain into _eth_meta."""
+    t0 = time.time()
+    try:
+        if not w3.is_connected():
+            raise RuntimeError("Web3 not connected")
+        info = {
+            "broker": escrow_contract.functions.broker().call(),
+            "token_symbol": token_contract.functions.symbol().call(),
+            "token_decimals": token_contract.functions.decimals().call(),
         }
+    except Exception as e:
+        with _eth_meta_lock:
+            _eth_meta.update(
+                {
+                    "connected": w3.is_connected(),
+                    "latency_ms": round((time.time() - t0) * 1000, 1),
+                    "last_error": str(e),
+                    "last_error_at": time.time(),
+                }
+            )
+        print("[eth] metadata refresh failed:", e)
+        return False
+
+    if info["token_decimals"] != TOKEN_DECIMALS:
+        print(
+            f"[eth] token reports {info['token_decimals']} decimals, "
+            f"expected {TOKEN_DECIMALS}; using the on-chain value"
+        )
+    with _eth_meta_lock:
+        _eth_meta.update(info)
+        _eth_meta.update(
+            {
+                "connected": True,
+                "latency_ms": round((time.time() - t0) * 1000, 1),
+                "refreshed_at": time.time(),
+                "last_error": None,
+            }
+        )
+    return True
+
+
+def eth_meta_refresher():
+    while True:
+        time.sleep(ETH_META_TTL)
+        refresh_eth_meta()
+
+
+def start_eth_meta_refresher():
+    """Load chain metadata once, then keep it fresh in a daemon thread."""
+    global _eth_meta_started
+    if _eth_meta_started:
+        return
+    _eth_meta_started = True
+    refresh_eth_meta()
+    threading.Thread(target=eth_meta_refresher, daemon=True).start()
+    print("[eth] metadata refresher thread started")
+
+
+def eth_meta() -> dict:
+    """Snapshot of the chain metadata with its age and staleness."""
+    start_eth_meta_refresher()
+    with _eth_meta_lock:
+        meta = dict(_eth_meta)
+    refreshed = meta.get("refreshed_at")
+    meta["age"] = round(time.time() - refreshed, 1) if refreshed else None
+    meta["stale"] = (
+        refreshed is None
+        or meta.get("last_error") is not None
+        or meta["age"] > 2 * ETH_META_TTL
     )
+    return meta
 
-    signed = w3.eth.account.sign_transaction(tx, private_key=ETH_BROKER_PRIVATE_KEY)
 
-    try:
-        tx_hash = w3.eth.send_raw_transaction(signed.raw_transaction)
-        tx_hash_hex = tx_hash.hex()
-        print(f"[eth] sent: {tx_hash_hex}")
+def token_decimals() -> int:
+    """decimals() of the token as read on-chain; raises until it is known."""
+    decimals = eth_meta().get("token_decimals")
+    if decimals is None and refresh_eth_meta():
+        decimals = eth_meta().get("token_decimals")
+    if decimals is None:
+        raise RuntimeError("token decimals not read from chain yet")
+    return decimals
 
-        receipt = w3.eth.wait_for_transaction_receipt(tx_hash, timeout=120)
-        print(f"[eth] mined in block {receipt.blockNumber}")
 
-        return tx_hash_hex
+# =====================================
+# Ethereum: batched deals() reads
+# =====================================
 
-    except Exception as e:
-        print(f"[eth] send_tx error: {e}")
-        return None
+# Multicall3 lives at the same address on mainnet, Sepolia and most other
+# chains; where it is not deployed, reads fall back to one eth_call per deal.
+MULTICALL3_ADDRESS = Web3.to_checksum_address(
+    os.environ.get("MULTICALL3_ADDRESS", "0xcA11bde05977b3631167028862bE2a173976CA11")
+)
+ETH_MULTICALL_BATCH = int(os.environ.get("ETH_MULTICALL_BATCH", "250"))
+ETH_DEALS_CACHE_TTL = float(os.environ.get("ETH_DEALS_CACHE_TTL", "5"))
+ETH_DEALS_CACHE_SIZE = int(os.environ.get("ETH_DEALS_CACHE_SIZE", "10000"))
+
+MULTICALL3_ABI = [
+    {
+        "inputs": [
+            {
+                "components": [
+                    {"internalType": "address", "name": "target", "type": "address"},
+                    {"internalType": "bool", "name": "allowFailure", "type": "bool"},
+                    {"internalType": "bytes", "name": "callData", "type": "bytes"},
+                ],
+                "internalType": "struct Multicall3.Call3[]",
+                "name": "calls",
+                "type": "tuple[]",
+            }
+        ],
+        "name": "aggregate3",
+        "outputs": [
+            {
+                "components": [
+                    {"internalType": "bool", "name": "success", "type": "bool"},
+                    {"internalType": "bytes", "name": "returnData", "type": "bytes"},
+                ],
+                "internalType": "struct Multicall3.Result[]",
+                "name": "returnData",
+                "type": "tuple[]",
+            }
+        ],
+        "stateMutability": "payable",
+        "type": "function",
+    },
+]
 
+multicall_contract = w3.eth.contract(address=MULTICALL3_ADDRESS, abi=MULTICALL3_ABI)
 
-def bridge_release_eth_from_canton(escrow_cid: str):
+# Output types of StablecoinEscrow.deals(bytes32), for decoding returnData
+_DEAL_TYPES = [
+    o["type"]
+    for o in next(f for f in ESCROW_ABI if f.get("name") == "deals")["outputs"]
+]
+
+_multicall_ok: bool | None = None  # None until probed
+# dealId (0x-hex) -> (read_at, deal); most recent reads last
+_deals_cache: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+_deals_cache_lock = threading.Lock()
+
+
+def _deal_id_bytes(deal_id) -> bytes:
+    if isinstance(deal_id, bytes):
+        return deal_id
+    return bytes.fromhex(deal_id.removeprefix("0x"))
+
+
+def _deal_record(values) -> dict:
+    buyer, seller, amount, deposited, done = values
+    return {
+        "exists": int(buyer, 16) != 0,
+        "buyer": buyer,
+        "seller": seller,
+        "amount": amount,
+        "deposited": deposited,
+        "releasedOrRefunded": done,
+    }
+
+
+def _multicall_available() -> bool:
+    global _multicall_ok
+    if _multicall_ok is None:
+        try:
+            _multicall_ok = len(w3.eth.get_code(MULTICALL3_ADDRESS)) > 0
+        except Exception as e:
+            print("[eth] multicall probe failed:", e)
+            return False
+        if not _multicall_ok:
+            print("[eth] no Multicall3 on this chain, reading deals one by one")
+    return _multicall_ok
+
+
+def _read_deals_multicall(ids: list[bytes]) -> list[dict | None]:
+    calls = [
+        (
+            SEPOLIA_ESCROW_ADDRESS,
+            True,
+            escrow_contract.functions.deals(i)._encode_transaction_data(),
+        )
+        for i in ids
+    ]
+    out = []
+    for n in range(0, len(calls), ETH_MULTICALL_BATCH):
+        batch = calls[n : n + ETH_MULTICALL_BATCH]
+        for ok, data in multicall_contract.functions.aggregate3(batch).call():
+            if ok and data:
+                out.append(_deal_record(w3.codec.decode(_DEAL_TYPES, data)))
+            else:
+                out.append(None)
+    return out
+
+
+def _read_deals_single(ids: list[bytes]) -> list[dict | None]:
+    out = []
+    for i in ids:
+        try:
+            out.append(_deal_record(escrow_contract.functions.deals(i).call()))
+        except Exception as e:
+            print(f"[eth] deals(0x{i.hex()}) call failed: {e}")
+            out.append(None)
+    return out
+
+
+def eth_deals(deal_ids, max_age: float = ETH_DEALS_CACHE_TTL) -> dict:
     """
-    After the Escrow is released on Canton, trigger the corresponding
-    release(dealId) on the Ethereum StablecoinEscrow contract.
+    On-chain StablecoinEscrow.deals(dealId) for many deals, keyed by 0x-hex
+    dealId. Reads younger than max_age seconds are served from cache; the
+    rest go out as Multicall3 aggregate3 calls (ETH_MULTICALL_BATCH deals per
+    eth_call), or one eth_call per deal where Multicall3 is not deployed.
+    None marks a deal whose read failed.
     """
+    now = time.time()
+    out: dict[str, dict | None] = {}
+    missing: list[bytes] = []
+    with _deals_cache_lock:
+        for d in deal_ids:
+            b = _deal_id_bytes(d)
+            h = "0x" + b.hex()
+            if h in out:
+                continue
+            hit = _deals_cache.get(h)
+            if hit and now - hit[0] < max_age:
+                out[h] = hit[1]
+            else:
+                out[h] = None
+                missing.append(b)
+    if not missing:
+        return out
+
+    records = None
+    if _multicall_available():
+        try:
+            records = _read_deals_multicall(missing)
+        except Exception as e:
+            print("[eth] multicall read failed, falling back to single calls:", e)
+    if records is None:
+        records = _read_deals_single(missing)
+
+    with _deals_cache_lock:
+        for b, rec in zip(missing, records):
+            h = "0x" + b.hex()
+            out[h] = rec
+            if rec is not None:
+                _deals_cache[h] = (now, rec)
+                _deals_cache.move_to_end(h)
+        while len(_deals_cache) > ETH_DEALS_CACHE_SIZE:
+            _deals_cache.popitem(last=False)
+    return out
+
+
+def eth_deals_invalidate(deal_id_hex: str):
+    """Drop a cached deal after sending a transaction that changes it."""
+    with _deals_cache_lock:
+        _deals_cache.pop(deal_id_hex, None)
+
+
+def _bridge_settle_eth(escrow_cid: str, action: str):
+    """Call release(dealId) or refund(dealId) for the deal mirroring escrow_cid."""
     if not w3 or not w3.is_connected():
-        print("[bridge] web3 not connected, skip eth release")
+        print(f"[bridge] web3 not connected, skip eth {action}")
         return {"error": "web3 not connected"}
 
     if not eth_broker_account:
-        print("[bridge] no ETH_BROKER_PRIVATE_KEY, skip eth release")
+        print(f"[bridge] no ETH_BROKER_PRIVATE_KEY, skip eth {action}")
         return {"error": "no broker key"}
 
     # Same deterministic dealId derivation as in bridge_create_eth_deal_from_canton
     deal_id_bytes = Web3.keccak(text=escrow_cid)
     deal_id_hex = "0x" + deal_id_bytes.hex()
 
-    # Check current state of the deal
-    try:
-        buyer, seller, amount, deposited, done = escrow_contract.functions.deals(
-            deal_id_bytes
-        ).call()
-
-        if not deposited:
-            print(f"[bridge] deal {deal_id_hex} not deposited yet, skip eth release")
+    # Check current state of the deal (always a fresh read)
+    with trace_span("eth_read_deal", dealId=deal_id_hex):
+        deal = eth_deals([deal_id_bytes], max_age=0)[deal_id_hex]
+    if deal is not None:
+        if not deal["deposited"]:
+            print(f"[bridge] deal {deal_id_hex} not deposited yet, skip eth {action}")
             return {"dealId": deal_id_hex, "skipped": "not deposited"}
 
-        if done:
+        if deal["releasedOrRefunded"]:
             print(
-                f"[bridge] deal {deal_id_hex} already released/refunded, skip eth release"
+                f"[bridge] deal {deal_id_hex} already released/refunded, skip eth {action}"
             )
             return {"dealId": deal_id_hex, "skipped": "already done"}
 
-    except Exception as e:
-        print(f"[bridge] deals({deal_id_hex}) call failed: {e}")
-
-    # If we reach here we can attempt release(dealId)
+    # If we reach here we can attempt release(dealId) / refund(dealId)
     try:
-        fn = escrow_contract.functions.release(deal_id_bytes)
-        tx_hash = send_tx(fn)
-        print(f"[bridge] eth release sent for {deal_id_hex}: {tx_hash}")
+        fn = getattr(escrow_contract.functions, action)(deal_id_bytes)
+        with trace_span(f"eth_{action}", dealId=deal_id_hex):
+            tx_hash = send_tx(fn)
+        eth_deals_invalidate(deal_id_hex)
+        if tx_hash and not tx_hash.startswith("0x"):
+            tx_hash = f"0x{tx_hash}"  # same form as createDeal's tx_hash
+        print(f"[bridge] eth {action} sent for {deal_id_hex}: {tx_hash}")
         return {"dealId": deal_id_hex, "tx_hash": tx_hash}
+    except TxOutcomeUnknown:
+        raise  # the job is parked as 'unknown', not retried
     except Exception as e:
-        print(f"[bridge] eth release failed for {deal_id_hex}: {e}")
+        print(f"[bridge] eth {action} failed for {deal_id_hex}: {e}")
         return {"dealId": deal_id_hex, "error": str(e)}
 
 
+def bridge_release_eth_from_canton(escrow_cid: str):
+    """
+    After the Escrow is released on Canton, trigger the corresponding
+    release(dealId) on the Ethereum StablecoinEscrow contract.
+    """
+    return _bridge_settle_eth(escrow_cid, "release")
+
+
+def bridge_refund_eth_from_canton(escrow_cid: str):
+    """
+    After the Escrow is refunded on Canton, trigger the corresponding
+    refund(dealId) on the Ethereum StablecoinEscrow contract.
+    """
+    return _bridge_settle_eth(escrow_cid, "refund")
+
+
+# =====================================
+# Bridge store: job queue + deal map (SQLite, shared by all workers)
+# =====================================
+
+BRIDGE_DB_PATH = os.environ.get(
+    "BRIDGE_DB_PATH", str(Path(__file__).resolve().parent / "bridge.db")
+)
+BRIDGE_WORKERS = int(os.environ.get("BRIDGE_WORKERS", "4"))
+BRIDGE_JOB_MAX_ATTEMPTS = int(os.environ.get("BRIDGE_JOB_MAX_ATTEMPTS", "3"))
+BRIDGE_JOB_STALE = float(os.environ.get("BRIDGE_JOB_STALE", "300"))
+
+_bridge_db_local = threading.local()
+_bridge_job_event = threading.Event()
+_bridge_workers_started = False
+
+
+def bridge_db() -> sqlite3.Connection:
+    """The calling thread's connection to the bridge database."""
+    conn = getattr(_bridge_db_local, "conn", None)
+    if conn is None:
+        conn = sqlite3.connect(BRIDGE_DB_PATH, timeout=10, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS bridge_jobs (
+                id         TEXT PRIMARY KEY,
+                kind       TEXT NOT NULL,
+                args       TEXT NOT NULL,
+                status     TEXT NOT NULL,
+                attempts   INTEGER NOT NULL DEFAULT 0,
+                result     TEXT,
+                error      TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                run_after  REAL NOT NULL DEFAULT 0
+            );
+            CREATE INDEX IF NOT EXISTS bridge_jobs_queue
+                ON bridge_jobs (status, run_after, created_at);
+
+            CREATE TABLE IF NOT EXISTS deal_map (
+                deal_id    TEXT PRIMARY KEY,
+                escrow_cid TEXT NOT NULL,
+                status     TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS deal_map_escrow ON deal_map (escrow_cid);
+            CREATE INDEX IF NOT EXISTS deal_map_status ON deal_map (status);
+
+            CREATE TABLE IF NOT EXISTS bridge_cursor (
+                name       TEXT PRIMARY KEY,
+                block      INTEGER NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            """)
+        _bridge_db_local.conn = conn
+    return conn
+
+
+DEAL_MAP_CACHE_SIZE = int(os.environ.get("DEAL_MAP_CACHE_SIZE", "10000"))
+DEAL_MAP_FLUSH_INTERVAL = float(os.environ.get("DEAL_MAP_FLUSH_INTERVAL", "0.2"))
+DEAL_MAP_BATCH = 200
+
+# Read-through LRU in front of the deal_map table: dealId -> escrow_cid
+# (the mapping never changes once written, so it is safe across processes)
+_deal_cache: OrderedDict[str, str] = OrderedDict()
+_deal_cache_lock = threading.Lock()
+
+# Buffered writes: dealId -> (escrow_cid, status, updated_at)
+_deal_writes: dict[str, tuple[str, str, float]] = {}
+_deal_writes_lock = threading.Lock()
+# Serializes flushes, so a deal_map_flush() returns only once every row
+# buffered before it (including a batch the writer thread took) is committed
+_deal_flush_lock = threading.Lock()
+_deal_flush_event = threading.Event()
+_deal_writer_started = False
+
+
+def _deal_cache_put(deal_id: str, escrow_cid: str):
+    with _deal_cache_lock:
+        _deal_cache[deal_id] = escrow_cid
+        _deal_cache.move_to_end(deal_id)
+        while len(_deal_cache) > DEAL_MAP_CACHE_SIZE:
+            _deal_cache.popitem(last=False)
+
+
+def deal_map_put(deal_id: str, escrow_cid: str, status: str = "created"):
+    """Record dealId -> escrow_cid (and its status); written in batches."""
+    _deal_cache_put(deal_id, escrow_cid)
+    with _deal_writes_lock:
+        _deal_writes[deal_id] = (escrow_cid, status, time.time())
+        full = len(_deal_writes) >= DEAL_MAP_BATCH
+    start_deal_map_writer()
+    if full:
+        _deal_flush_event.set()
+
+
+def deal_map_flush():
+    """Write all buffered deal_map rows in one transaction."""
+    global _deal_writes
+    with _deal_flush_lock:
+        with _deal_writes_lock:
+            batch, _deal_writes = _deal_writes, {}
+        if not batch:
+            return
+        db = bridge_db()
+        db.execute("BEGIN")
+        try:
+            db.executemany(
+                "INSERT INTO deal_map (deal_id, escrow_cid, status, updated_at)"
+                " VALUES (?, ?, ?, ?) ON CONFLICT (deal_id) DO UPDATE SET"
+                " escrow_cid = excluded.escrow_cid, status = excluded.status,"
+                " updated_at = excluded.updated_at",
+                [(d, cid, st, ts) for d, (cid, st, ts) in batch.items()],
+            )
+            db.execute("COMMIT")
+        except Exception:
+            db.execute("ROLLBACK")
+            # Put the batch back unless newer writes replaced those rows
+            with _deal_writes_lock:
+                for d, row in batch.items():
+                    _deal_writes.setdefault(d, row)
+            raise
+
+
+def deal_map_writer():
+    while True:
+        _deal_flush_event.wait(timeout=DEAL_MAP_FLUSH_INTERVAL)
+        _deal_flush_event.clear()
+        try:
+            deal_map_flush()
+        except Exception as e:
+            print("[deal-map] flush failed:", e)
+
+
+def start_deal_map_writer():
+    """Start the batched deal_map writer thread (once per process)."""
+    global _deal_writer_started
+    if _deal_writer_started:
+        return
+    _deal_writer_started = True
+    threading.Thread(target=deal_map_writer, daemon=True).start()
+
+
+def deal_map_get(deal_id: str) -> str | None:
+    """Escrow contractId for an Ethereum dealId: LRU, then pending writes, then DB."""
+    with _deal_cache_lock:
+        cid = _deal_cache.get(deal_id)
+        if cid:
+            _deal_cache.move_to_end(deal_id)
+            return cid
+    pending = _deal_writes.get(deal_id)
+    if pending:
+        return pending[0]
+
+    row = (
+        bridge_db()
+        .execute("SELECT escrow_cid FROM deal_map WHERE deal_id = ?", (deal_id,))
+        .fetchone()
+    )
+    if row is None:
+        return None
+    _deal_cache_put(deal_id, row["escrow_cid"])
+    return row["escrow_cid"]
+
+
+def deal_map_status(deal_id: str) -> str | None:
+    """Current bridge status of a deal (pending writes first, then DB)."""
+    pending = _deal_writes.get(deal_id)
+    if pending:
+        return pending[1]
+    row = (
+        bridge_db()
+        .execute("SELECT status FROM deal_map WHERE deal_id = ?", (deal_id,))
+        .fetchone()
+    )
+    return row["status"] if row else None
+
+
+def deal_map_by_escrow(escrow_cid: str) -> dict | None:
+    """The deal_map row for a Canton Escrow contractId."""
+    row = (
+        bridge_db()
+        .execute("SELECT * FROM deal_map WHERE escrow_cid = ?", (escrow_cid,))
+        .fetchone()
+    )
+    return dict(row) if row else None
+
+
+# Job kind -> handler(**args)
+BRIDGE_JOB_HANDLERS = {
+    "createDeal": bridge_create_eth_deal_from_canton,
+    "release": bridge_release_eth_from_canton,
+    "refund": bridge_refund_eth_from_canton,
+}
+
+
+def enqueue_bridge_job(kind: str, **args) -> dict:
+    """Persist a bridge job and wake a worker; returns {"jobId", "status"}."""
+    if kind not in BRIDGE_JOB_HANDLERS:
+        raise ValueError(f"unknown bridge job kind: {kind}")
+    start_bridge_workers()
+    job_id = uuid.uuid4().hex
+    now = time.time()
+    bridge_db().execute(
+        "INSERT INTO bridge_jobs (id, kind, args, status, created_at, updated_at)"
+        " VALUES (?, ?, ?, 'queued', ?, ?)",
+        (job_id, kind, json.dumps(args), now, now),
+    )
+    _bridge_job_event.set()
+    print(f"[bridge-jobs] queued {kind} job {job_id}")
+    return {"jobId": job_id, "kind": kind, "status": "queued"}
+
+
+def _claim_bridge_job():
+    """Atomically move the oldest runnable job to 'running' (any worker/process)."""
+    db = bridge_db()
+    now = time.time()
+    db.execute("BEGIN IMMEDIATE")
+    try:
+        row = db.execute(
+            "SELECT * FROM bridge_jobs WHERE status = 'queued' AND run_after <= ?"
+            " ORDER BY created_at LIMIT 1",
+            (now,),
+        ).fetchone()
+        if row:
+            db.execute(
+                "UPDATE bridge_jobs SET status = 'running', attempts = attempts + 1,"
+                " updated_at = ? WHERE id = ?",
+                (now, row["id"]),
+            )
+        db.execute("COMMIT")
+        return row
+    except Exception:
+        db.execute("ROLLBACK")
+        raise
+
+
+def _finish_bridge_job(
+    row, result=None, error: str | None = None, unknown: bool = False
+):
+    now = time.time()
+    if error is None:
+        status, run_after = "done", 0
+    elif unknown:
+        # The transaction may be on its way: retrying could send it twice
+        status, run_after = "unknown", 0
+    elif row["attempts"] + 1 < BRIDGE_JOB_MAX_ATTEMPTS:
+        status, run_after = "queued", now + 5 * (row["attempts"] + 1)
+    else:
+        status, run_after = "failed", 0
+    bridge_db().execute(
+        "UPDATE bridge_jobs SET status = ?, result = ?, error = ?, updated_at = ?,"
+        " run_after = ? WHERE id = ?",
+        (status, json.dumps(result), error, now, run_after, row["id"]),
+    )
+    print(f"[bridge-jobs] {row['kind']} job {row['id']} -> {status}")
+
+
+def bridge_worker():
+    """Run queued bridge jobs; several workers (and processes) can share the DB."""
+    while True:
+        try:
+            row = _claim_bridge_job()
+        except Exception as e:
+            print("[bridge-jobs] claim failed:", e)
+            row = None
+        if row is None:
+            _bridge_job_event.wait(timeout=2)
+            _bridge_job_event.clear()
+            continue
+
+        try:
+            with trace_flow(f"bridge_{row['kind']}", job=row["id"]):
+                result = BRIDGE_JOB_HANDLERS[row["kind"]](**json.loads(row["args"]))
+            error = None
+            if isinstance(result, dict):
+                error = result.get("error")
+                if error is None and "tx_hash" in result and not result["tx_hash"]:
+                    error = "transaction was not broadcast"
+        except TxOutcomeUnknown as e:
+            _finish_bridge_job(row, None, str(e), unknown=True)
+            continue
+        except Exception as e:
+            result, error = None, str(e)
+        _finish_bridge_job(row, result, error)
+
+
+def start_bridge_workers():
+    """Start BRIDGE_WORKERS job workers (once per process)."""
+    global _bridge_workers_started
+    if _bridge_workers_started:
+        return
+    _bridge_workers_started = True
+
+    # Jobs left 'running' by a crashed process are picked up again
+    bridge_db().execute(
+        "UPDATE bridge_jobs SET status = 'queued' WHERE status = 'running'"
+        " AND updated_at < ?",
+        (time.time() - BRIDGE_JOB_STALE,),
+    )
+    for _ in range(BRIDGE_WORKERS):
+        threading.Thread(target=bridge_worker, daemon=True).start()
+    print(f"[bridge-jobs] {BRIDGE_WORKERS} workers started")
+
+
+def get_bridge_job(job_id: str) -> dict | None:
+    row = (
+        bridge_db()
+        .execute("SELECT * FROM bridge_jobs WHERE id = ?", (job_id,))
+        .fetchone()
+    )
+    if row is None:
+        return None
+    job = dict(row)
+    job["args"] = json.loads(job["args"])
+    job["result"] = json.loads(job["result"]) if job["result"] else None
+    tx_hash = (job["result"] or {}).get("tx_hash")
+    if tx_hash:
+        job["tx"] = tx_status(tx_hash)
+    return job
+
+
 # =====================================
 # Helpers: project root + packageId
 # =====================================
@@ -463,14 +1610,14 @@ def find_project_root() -> Path:
     return _proj_root_cache
 
 
-def latest_dar_path() -> Path:
+def latest_dar_path(build_if_missing: bool = True) -> Path:
     """Return the most recently built DAR under .daml/dist, building if needed."""
     root = find_project_root()
     dist = root / ".daml" / "dist"
     dist.mkdir(parents=True, exist_ok=True)
 
     dars = sorted(dist.glob("*.dar"), key=lambda p: p.stat().st_mtime, reverse=True)
-    if not dars:
+    if not dars and build_if_missing:
         subprocess.run("daml build", cwd=str(root), shell=True, check=True)
         dars = sorted(dist.glob("*.dar"), key=lambda p: p.stat().st_mtime, reverse=True)
     if not dars:
@@ -478,15 +1625,35 @@ def latest_dar_path() -> Path:
     return dars[0]
 
 
-def get_package_id() -> str:
-    """Use damlc inspect-dar to obtain the main packageId of the DAR."""
-    global _pkg_cache
-    if _pkg_cache:
-        return _pkg_cache
+_PKG_ID_RE = re.compile(r"^[0-9a-f]{64}$")
 
-    dar = latest_dar_path()
-    cmd = [DAML_CMD, "damlc", "inspect-dar", str(dar), "--json"]
-    res = subprocess.run(
+
+def package_id_from_dar(dar) -> str | None:
+    """
+    Read the main packageId straight from the DAR manifest (no daml CLI).
+
+    The DAR is a zip whose META-INF/MANIFEST.MF names the main DALF, e.g.
+      Main-Dalf: escrow-0.0.4-<pkgId>/escrow-0.0.4-<pkgId>.dalf
+    Manifest lines are wrapped at 72 bytes with a leading-space continuation.
+    """
+    with zipfile.ZipFile(dar) as zf:
+        manifest = zf.read("META-INF/MANIFEST.MF").decode()
+
+    unfolded = re.sub(r"\r?\n ", "", manifest)
+    for line in unfolded.splitlines():
+        if line.startswith("Main-Dalf:"):
+            dalf = line.split(":", 1)[1].strip()
+            stem = dalf.rsplit("/", 1)[-1].removesuffix(".dalf")
+            pkg = stem.rsplit("-", 1)[-1]
+            if _PKG_ID_RE.match(pkg):
+                return pkg
+    return None
+
+
+def inspect_dar_package_id(dar: Path) -> str:
+    """Use damlc inspect-dar to obtain the main packageId of the DAR."""
+    cmd = [DAML_CMD, "damlc", "inspect-dar", str(dar), "--json"]
+    res = subprocess.run(
         cmd,
         capture_output=True,
         text=True,
@@ -497,18 +1664,129 @@ def get_package_id() -> str:
     pkg = info.get("mainPackageId") or info.get("main_package_id")
     if not pkg:
         raise RuntimeError("Failed to extract main package id from inspect-dar.")
-    _pkg_cache = pkg
-    print(f"[i] Using packageId: {pkg} ({dar.name})")
+    return pkg
+
+
+def _pkg_id_cache_file() -> Path:
+    return find_project_root() / ".daml" / "package-id-cache.json"
+
+
+def resolve_package_id(dar: Path) -> str:
+    """
+    Resolve the main packageId of a DAR, using the on-disk cache keyed by
+    DAR path + mtime so that restarts skip the zip/CLI work entirely.
+    """
+    t0 = time.perf_counter()
+    pkg, source = _resolve_package_id(dar)
+    observe("package_id_resolve_seconds", time.perf_counter() - t0, source=source)
+    return pkg
+
+
+def _resolve_package_id(dar: Path) -> tuple[str, str]:
+    key = str(dar.resolve())
+    mtime = dar.stat().st_mtime_ns
+    cache_file = _pkg_id_cache_file()
+
+    try:
+        disk = json.loads(cache_file.read_text())
+    except Exception:
+        disk = {}
+    hit = disk.get(key)
+    if hit and hit.get("mtime") == mtime and hit.get("packageId"):
+        return hit["packageId"], "disk cache"
+
+    try:
+        pkg = package_id_from_dar(dar)
+    except Exception as e:
+        print(f"[i] Could not read DAR manifest of {dar.name}: {e}")
+        pkg = None
+    source = "manifest"
+    if not pkg:
+        pkg = inspect_dar_package_id(dar)
+        source = "cli"
+
+    disk[key] = {"mtime": mtime, "packageId": pkg}
+    try:
+        cache_file.write_text(json.dumps(disk, indent=2))
+    except Exception as e:
+        print("[i] Could not persist packageId cache:", e)
+    return pkg, source
+
+
+def install_package_id(pkg: str, source: str = ""):
+    """Switch to a new main packageId and rebuild the template-id table."""
+    global _pkg_cache, _tid_table
+    table = {name: f"{pkg}:{name}" for name in TEMPLATES}
+    with _pkg_lock:
+        _pkg_cache = pkg
+        _tid_table = table
+    print(f"[i] Using packageId: {pkg} ({source})")
+
+
+def init_package_id() -> str:
+    """Resolve the packageId eagerly at startup (may run `daml build`)."""
+    if PACKAGE_ID_OVERRIDE:
+        install_package_id(PACKAGE_ID_OVERRIDE, "DAML_PACKAGE_ID")
+        return PACKAGE_ID_OVERRIDE
+    dar = latest_dar_path(build_if_missing=True)
+    pkg = resolve_package_id(dar)
+    install_package_id(pkg, dar.name)
+    return pkg
+
+
+def get_package_id() -> str:
+    """Return the main packageId; never builds the DAR on the request path."""
+    if _pkg_cache:
+        return _pkg_cache
+
+    with _pkg_lock:
+        if _pkg_cache:
+            return _pkg_cache
+        dar = latest_dar_path(build_if_missing=False)
+        pkg = resolve_package_id(dar)
+    install_package_id(pkg, dar.name)
+    return pkg
+
+
+def reload_package(dar_bytes: bytes | None = None) -> str:
+    """
+    Pick up a new package version without restarting.
+
+    With dar_bytes the DAR is uploaded to the JSON API first and its packageId
+    is read from the uploaded archive; otherwise the latest local DAR is used.
+    """
+    if dar_bytes:
+        r = ledger_session().post(
+            f"{API_URL}/packages",
+            data=dar_bytes,
+            headers={
+                "Content-Type": "application/octet-stream",
+                "Authorization": f"Bearer {make_jwt()}",
+            },
+            timeout=60,
+        )
+        if r.status_code != 200:
+            raise RuntimeError(f"DAR upload failed ({r.status_code}): {r.text}")
+        pkg = package_id_from_dar(io.BytesIO(dar_bytes))
+        if not pkg:
+            raise RuntimeError("Uploaded DAR has no Main-Dalf in its manifest.")
+        install_package_id(pkg, "uploaded DAR")
+        return pkg
+
+    dar = latest_dar_path(build_if_missing=False)
+    pkg = resolve_package_id(dar)
+    install_package_id(pkg, dar.name)
     return pkg
 
 
 def tid(module_entity: str) -> str:
     """Turn 'Module:Entity' into a fully-qualified TemplateId <pkg>:Module:Entity."""
+    full = _tid_table.get(module_entity)
+    if full:
+        return full
     if ":" not in module_entity:
         raise ValueError("module_entity must be 'Module:Entity'")
-    pkg = get_package_id()
-    mod, ent = module_entity.split(":", 1)
-    return f"{pkg}:{mod}:{ent}"
+    return f"{get_package_id()}:{module_entity}"
 
 
 # =====================================
@@ -520,9 +1798,76 @@ def b64url(data: bytes) -> str:
     return base64.urlsafe_b64encode(data).decode().rstrip("=")
 
 
+# Signed tokens by (ledgerId, applicationId, actAs, readAs) -> (token, exp)
+_jwt_cache: dict[tuple, tuple[str, float | None]] = {}
+_jwt_lock = threading.Lock()
+_jwt_rsa_key = None
+
+
+def check_jwt_config():
+    """Fail at startup, not on the first ledger call, on a broken JWT setup."""
+    if JWT_ALG not in ("none", "HS256", "RS256"):
+        raise RuntimeError(f"DAML_JWT_ALG must be none, HS256 or RS256, not {JWT_ALG}")
+    if JWT_ALG == "HS256" and not JWT_SECRET:
+        raise RuntimeError("DAML_JWT_SECRET is required for HS256")
+    if JWT_ALG == "RS256":
+        try:
+            import jwt  # noqa: F401
+            import cryptography  # noqa: F401
+        except ImportError as e:
+            raise RuntimeError(
+                f"DAML_JWT_ALG=RS256 needs PyJWT and cryptography ({e});"
+                " pip install -r server/requirements.txt"
+            )
+        if not JWT_KEY_FILE or not Path(JWT_KEY_FILE).is_file():
+            raise RuntimeError(
+                "DAML_JWT_KEY_FILE must point to a PEM private key for RS256"
+            )
+
+
+check_jwt_config()
+
+
+def sign_jwt(header: dict, payload: dict) -> str:
+    """Encode and sign a JWT according to JWT_ALG."""
+    if JWT_ALG == "RS256":
+        global _jwt_rsa_key
+        import jwt as pyjwt  # only needed for RS256, see check_jwt_config
+
+        if _jwt_rsa_key is None:
+            _jwt_rsa_key = Path(JWT_KEY_FILE).read_text()
+        return pyjwt.encode(payload, _jwt_rsa_key, algorithm="RS256")
+
+    signing_input = (
+        f"{b64url(json.dumps(header).encode())}.{b64url(json.dumps(payload).encode())}"
+    )
+    if JWT_ALG == "HS256":
+        if not JWT_SECRET:
+            raise RuntimeError("DAML_JWT_SECRET is required for HS256")
+        sig = hmac.new(
+            JWT_SECRET.encode(), signing_input.encode(), hashlib.sha256
+        ).digest()
+        return f"{signing_input}.{b64url(sig)}"
+    return f"{signing_input}."
+
+
 def make_jwt(act_as=None, read_as=None) -> str:
-    """Create a JWT (alg=none) with optional actAs/readAs claims."""
-    header = {"alg": "none"}
+    """
+    Return a JWT with optional actAs/readAs claims.
+
+    Tokens are cached per (ledgerId, applicationId, actAs, readAs) and only
+    re-signed when they get within JWT_REFRESH_MARGIN seconds of their exp.
+    """
+    act_as = sorted(set(act_as or []))
+    read_as = sorted(set(read_as or []))
+    key = (LEDGER_ID, APPLICATION_ID, tuple(act_as), tuple(read_as))
+    now = time.time()
+
+    cached = _jwt_cache.get(key)
+    if cached and (cached[1] is None or cached[1] - JWT_REFRESH_MARGIN > now):
+        return cached[0]
+
+    header = {"alg": JWT_ALG, "typ": "JWT"} if JWT_ALG != "none" else {"alg": "none"}
     payload = {
         "sub": "demo",
         "https://daml.com/ledger-api": {
@@ -536,17 +1881,135 @@ def make_jwt(act_as=None, read_as=None) -> str:
     if read_as:
         la["readAs"] = read_as
 
-    return (
-        f"{b64url(json.dumps(header).encode())}.{b64url(json.dumps(payload).encode())}."
-    )
+    exp = None
+    if JWT_TTL > 0:
+        exp = int(now) + JWT_TTL
+        payload["exp"] = exp
+
+    token = sign_jwt(header, payload)
+
+    with _jwt_lock:
+        if len(_jwt_cache) >= JWT_CACHE_MAX:
+            # Drop expired entries first, then the oldest ones
+            for k in [k for k, (_, e) in _jwt_cache.items() if e and e <= now]:
+                del _jwt_cache[k]
+            while len(_jwt_cache) >= JWT_CACHE_MAX:
+                del _jwt_cache[next(iter(_jwt_cache))]
+        _jwt_cache[key] = (token, exp)
+    return token
+
+
+# Read-only JSON API paths that are safe to resend after a dropped connection
+IDEMPOTENT_PATHS = {"/query", "/fetch", "/parties"}
+
+# One adapter (= one urllib3 pool manager) shared by every thread. Each thread
+# gets its own Session on top of it, so keep-alive connections are reused
+# across requests without sharing Session state between threads.
+_ledger_adapter = HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=LEDGER_HTTP_POOL_SIZE,
+    pool_block=True,
+)
+_ledger_local = threading.local()
+_ledger_retries = 0
+
+# Bounded pool for fanning out independent ledger reads
+_ledger_pool = ThreadPoolExecutor(
+    max_workers=LEDGER_FANOUT_WORKERS, thread_name_prefix="ledger"
+)
+
+
+def ledger_session() -> requests.Session:
+    """Return the calling thread's Session bound to the shared ledger pool."""
+    s = getattr(_ledger_local, "session", None)
+    if s is None:
+        s = requests.Session()
+        s.mount("http://", _ledger_adapter)
+        s.mount("https://", _ledger_adapter)
+        _ledger_local.session = s
+    return s
 
 
-def http_post(path: str, payload: dict, token: str | None = None):
+def ledger_request(
+    method: str,
+    path: str,
+    payload: dict | None = None,
+    token: str | None = None,
+    timeout: float | None = None,
+):
+    """
+    Send a request to the JSON API over the pooled session.
+
+    Read-only paths (IDEMPOTENT_PATHS) are retried when the connection is
+    reset; commands (create / exercise) are never resent.
+    """
+    global _ledger_retries
     url = f"{API_URL}{path}"
     headers = {"Content-Type": "application/json"}
     if token:
         headers["Authorization"] = f"Bearer {token}"
-    r = requests.post(url, json=payload, headers=headers, timeout=20)
+
+    labels = _ledger_labels(path, payload)
+    inc("ledger_requests_in_flight", 1, path=path)
+    t0 = time.perf_counter()
+    status = "exception"
+    try:
+        attempts = 1 + (LEDGER_HTTP_READ_RETRIES if path in IDEMPOTENT_PATHS else 0)
+        for attempt in range(attempts):
+            try:
+                r = ledger_session().request(
+                    method,
+                    url,
+                    json=payload,
+                    headers=headers,
+                    timeout=timeout or LEDGER_HTTP_TIMEOUT,
+                )
+                status = str(r.status_code)
+                return r
+            except requests.ConnectionError as e:
+                if attempt + 1 >= attempts:
+                    raise
+                _ledger_retries += 1
+                print(f"[http] {method} {path} connection error, retrying: {e}")
+    finally:
+        observe("ledger_request_seconds", time.perf_counter() - t0, **labels)
+        inc("ledger_requests_total", status=status, **labels)
+        inc("ledger_requests_in_flight", -1, path=path)
+
+
+def _ledger_labels(path: str, payload: dict | None) -> dict:
+    """Metric labels of a JSON API call: path, template ('Module:Entity'), choice."""
+    template = ""
+    if payload:
+        t = payload.get("templateId") or (payload.get("templateIds") or [""])[0]
+        template = t.split(":", 1)[1] if t.count(":") >= 2 else t
+    return {
+        "path": path,
+        "template": template,
+        "choice": (payload or {}).get("choice", ""),
+    }
+
+
+def ledger_http_stats() -> dict:
+    """Connection reuse counters of the JSON API pool."""
+    pools = _ledger_adapter.poolmanager.pools
+    reqs = conns = 0
+    for key in pools.keys():
+        pool = pools.get(key)
+        if pool is not None:
+            reqs += pool.num_requests
+            conns += pool.num_connections
+    return {
+        "pool_size": LEDGER_HTTP_POOL_SIZE,
+        "requests": reqs,
+        "connections": conns,
+        "reused": max(reqs - conns, 0),
+        "retries": _ledger_retries,
+    }
+
+
+def http_post(path: str, payload: dict, token: str | None = None, timeout=None):
+    r = ledger_request("POST", path, payload, token=token, timeout=timeout)
     try:
         data = r.json()
     except Exception:
@@ -559,21 +2022,30 @@ def http_post(path: str, payload: dict, token: str | None = None):
 # =====================================
 
 
-def refresh_party_cache_from_ledger():
+def refresh_party_cache_from_ledger() -> bool:
     """
     Fetch the party list from the JSON API (/v1/parties) and build a mapping:
       "Alice-1"                -> "Alice-1::1220..."
       "Alice-1::1220...2393"   -> "Alice-1::1220...2393"
+
+    The new mapping replaces the old one in a single assignment, so readers
+    never see a half-built cache. Returns True on success.
     """
-    global _party_cache
+    t0 = time.perf_counter()
+    ok = _refresh_party_cache()
+    observe(
+        "party_refresh_seconds",
+        time.perf_counter() - t0,
+        result="ok" if ok else "error",
+    )
+    return ok
+
+
+def _refresh_party_cache() -> bool:
+    global _party_cache, _party_misses, _party_cache_refreshed_at
     try:
-        url = f"{API_URL}/parties"
         token = make_jwt()  # JWT without actAs/readAs
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {token}",
-        }
-        r = requests.get(url, headers=headers, timeout=10)
+        r = ledger_request("GET", "/parties", token=token, timeout=10)
         r.raise_for_status()
         body = r.json()
 
@@ -585,182 +2057,968 @@ def refresh_party_cache_from_ledger():
             if not ident:
                 continue
 
-            # Always map the full identifier
-            cache[ident] = ident
+            # Always map the full identifier
+            cache[ident] = ident
+
+            # Also map shortened alias without namespace, e.g. "Alice-1"
+            short = ident.split("::", 1)[0]
+            cache[short] = ident
+
+        _party_cache = cache
+        _party_misses = {}
+        _party_cache_refreshed_at = time.time()
+        print(f"[i] Party cache refreshed from JSON API: {len(result)} parties")
+        return True
+
+    except Exception as e:
+        print("[i] Could not refresh party cache from JSON API:", e)
+        return False
+
+
+def _party_refresh_once():
+    try:
+        refresh_party_cache_from_ledger()
+    finally:
+        _party_refresh_lock.release()
+
+
+def request_party_refresh():
+    """
+    Trigger a background refresh unless one is already running (single-flight).
+    Never blocks the caller.
+    """
+    if _party_refresh_lock.acquire(blocking=False):
+        threading.Thread(target=_party_refresh_once, daemon=True).start()
+
+
+def ensure_party_cache():
+    """
+    Blocking load while the cache is still empty (cold start, or the
+    import-time load failed), so the first requests never send raw aliases.
+    Retried at most every PARTY_NEGATIVE_TTL seconds while the JSON API is down.
+    """
+    global _party_cold_load_at
+    if _party_cache:
+        return
+    with _party_refresh_lock:  # waits for an in-flight refresh
+        now = time.time()
+        if _party_cache or now - _party_cold_load_at < PARTY_NEGATIVE_TTL:
+            return
+        _party_cold_load_at = now
+        refresh_party_cache_from_ledger()
+
+
+def party_refresher():
+    """Refresh the party cache every PARTY_REFRESH_INTERVAL seconds."""
+    while True:
+        if _party_refresh_lock.acquire(blocking=False):
+            _party_refresh_once()
+        time.sleep(PARTY_REFRESH_INTERVAL)
+
+
+def start_party_refresher():
+    """Run the party refresher in a background daemon thread (once per process)."""
+    global _party_refresher_started
+    if _party_refresher_started:
+        return
+    _party_refresher_started = True
+    t = threading.Thread(target=party_refresher, daemon=True)
+    t.start()
+    print("[i] party refresher thread started")
+
+
+def _on_alias_event(kind: str, ev):
+    """Apply one PartyAlias stream event to the alias index."""
+    global _alias_index, _alias_by_cid, _alias_live
+    if kind == "reset":
+        # A fresh ACS snapshot follows; build it aside and swap when live
+        _alias_live = False
+        _alias_by_cid = {}
+    elif kind == "created":
+        pld = ev["payload"]
+        _alias_by_cid[ev["contractId"]] = (pld["alias"], pld["party"])
+        if _alias_live:
+            _alias_index[pld["alias"]] = pld["party"]
+    elif kind == "archived":
+        entry = _alias_by_cid.pop(ev["contractId"], None)
+        if entry and _alias_live and _alias_index.get(entry[0]) == entry[1]:
+            del _alias_index[entry[0]]
+    elif kind == "live" and not _alias_live:
+        _alias_index = {alias: party for alias, party in _alias_by_cid.values()}
+        _alias_live = True
+        print(f"[i] PartyAlias index live: {len(_alias_index)} aliases")
+
+
+def start_alias_index():
+    """Stream Parties:PartyAlias into the in-memory alias index (once per process)."""
+    global _alias_stream_started
+    if _alias_stream_started:
+        return
+    _alias_stream_started = True
+    start_ledger_stream(
+        "party-alias",
+        ["Parties:PartyAlias"],
+        [PARTY_ALIAS_ADMIN],
+        _on_alias_event,
+    )
+
+
+def get_party_id(name: str) -> str:
+    """
+    Resolve a human name (e.g. 'Alice-1') to a full Party identifier.
+
+    On-ledger PartyAlias contracts take precedence over the /v1/parties
+    directory. If name is already a full Party id (contains '::'), it is
+    returned as-is.
+    If not found in the cache, we fall back to the original name (demo mode)
+    and schedule a background refresh; the miss is remembered for
+    PARTY_NEGATIVE_TTL seconds so unknown names don't trigger a refresh
+    on every call.
+    """
+    if "::" in name or name.startswith("party-"):
+        return name
+
+    start_party_refresher()
+    start_alias_index()
+    ensure_party_cache()
+
+    ident = _alias_index.get(name) or _party_cache.get(name)
+    if ident:
+        return ident
+
+    now = time.time()
+    if _party_misses.get(name, 0.0) > now:
+        return name
+    _party_misses[name] = now + PARTY_NEGATIVE_TTL
+    request_party_refresh()
+
+    print(f"WARNING: party '{name}' not found in cache, using as-is")
+    return name
+
+
+# =====================================
+# JSON API wrappers: query / create / exercise / fetch
+# =====================================
+
+
+def query(template_ids, read_as: str, filter: dict | None = None, timeout=None):
+    """
+    Call /v1/query with readAs permissions.
+    filter is a JSON API query (e.g. {"seller": partyId}) evaluated on the
+    participant, so only matching contracts are sent back.
+    """
+    party = get_party_id(read_as)
+    token = make_jwt(read_as=[party])
+    payload = {"templateIds": template_ids, "query": filter or {}}
+    return http_post("/query", payload, token=token, timeout=timeout)
+
+
+def create(template_id: str, payload: dict, act_as_party: str):
+    party = get_party_id(act_as_party)
+    token = make_jwt(act_as=[party])
+    body = {"templateId": template_id, "payload": payload}
+    return http_post("/create", body, token=token)
+
+
+def exercise(
+    template_id: str, contract_id: str, act_as_party: str, choice: str, argument=None
+):
+    party = get_party_id(act_as_party)
+    token = make_jwt(act_as=[party])
+    body = {
+        "templateId": template_id,
+        "contractId": contract_id,
+        "choice": choice,
+        "argument": argument or {},
+    }
+    return http_post("/exercise", body, token=token)
+
+
+def exercise_as(
+    template_id: str, contract_id: str, act_as: list, choice: str, argument=None
+):
+    """exercise() submitted jointly by several parties (one transaction)."""
+    token = make_jwt(act_as=[get_party_id(p) for p in act_as])
+    body = {
+        "templateId": template_id,
+        "contractId": contract_id,
+        "choice": choice,
+        "argument": argument or {},
+    }
+    return http_post("/exercise", body, token=token)
+
+
+def create_and_exercise(
+    template_id: str, payload: dict, act_as: list, choice: str, argument=None
+):
+    """
+    Call /v1/create-and-exercise: create a contract and exercise a choice on
+    it in a single transaction, submitted jointly by the act_as parties.
+    """
+    token = make_jwt(act_as=[get_party_id(p) for p in act_as])
+    body = {
+        "templateId": template_id,
+        "payload": payload,
+        "choice": choice,
+        "argument": argument or {},
+    }
+    return http_post("/create-and-exercise", body, token=token)
+
+
+def funded_escrow(data: dict) -> dict:
+    """
+    The Escrow opened by a funding transaction (EscrowFunding.Fund or
+    Offer.AcceptAndFund), shaped like a /v1/create response.
+    """
+    result = data.get("result", {})
+    for ev in result.get("events", []):
+        created = ev.get("created")
+        if created and _acs_template(created["templateId"]) == "Escrow:Escrow":
+            return {"status": data.get("status", 200), "result": created}
+    return {
+        "status": data.get("status", 200),
+        "result": {"contractId": result.get("exerciseResult")},
+    }
+
+
+def fetch(template_id: str, contract_id: str, read_as: str):
+    """Call /v1/fetch to retrieve a single contract by contractId."""
+    party = get_party_id(read_as)
+    token = make_jwt(read_as=[party])
+    body = {"templateId": template_id, "contractId": contract_id}
+    return http_post("/fetch", body, token=token)
+
+
+# =====================================
+# Live queries: /v1/stream/query
+# =====================================
+
+
+def ledger_stream(name: str, templates: list[str], read_as: list[str], on_event):
+    """
+    Follow /v1/stream/query for the given 'Module:Entity' templates forever.
+
+    on_event(kind, ev) is called with:
+      "reset"    – an ACS snapshot is about to be replayed (ev is None)
+      "created"  – ev is the created contract
+      "archived" – ev is {"contractId", "templateId"}
+      "live"     – the snapshot is complete / a new offset was reached
+      "disconnected" – the connection dropped; a resume will follow
+
+    After a disconnect the stream resumes from the last offset, so no reset
+    is needed; a package change forces a fresh snapshot.
+    """
+    offset = None
+    backoff = 1
+    while True:
+        ws = None
+        try:
+            pkg = get_package_id()
+            parties = [get_party_id(p) for p in read_as]
+            token = make_jwt(read_as=parties)
+            ws = websocket.create_connection(
+                STREAM_URL,
+                subprotocols=[f"jwt.token.{token}", "daml.ws.auth"],
+                timeout=60,
+            )
+            if offset:
+                ws.send(json.dumps({"offset": offset}))
+            else:
+                on_event("reset", None)
+            ws.send(json.dumps({"templateIds": [tid(t) for t in templates]}))
+            print(f"[stream:{name}] connected (offset={offset})")
+            backoff = 1
+
+            while True:
+                msg = json.loads(ws.recv())
+                if "errors" in msg:
+                    raise RuntimeError(f"stream error: {msg['errors']}")
+                for e in msg.get("events", []):
+                    if "created" in e:
+                        on_event("created", e["created"])
+                    elif "archived" in e:
+                        on_event("archived", e["archived"])
+                if msg.get("offset"):
+                    offset = msg["offset"]
+                    on_event("live", offset)
+                if get_package_id() != pkg:
+                    print(f"[stream:{name}] package changed, re-subscribing")
+                    offset = None
+                    break
+
+        except Exception as e:
+            print(f"[stream:{name}] disconnected: {e}")
+            on_event("disconnected", None)
+            time.sleep(backoff)
+            backoff = min(backoff * 2, 30)
+        finally:
+            if ws is not None:
+                try:
+                    ws.close()
+                except Exception:
+                    pass
+
+
+def start_ledger_stream(name: str, templates, read_as, on_event):
+    """Run ledger_stream in a background daemon thread."""
+    t = threading.Thread(
+        target=ledger_stream,
+        args=(name, list(templates), list(read_as), on_event),
+        daemon=True,
+    )
+    t.start()
+    print(f"[stream:{name}] thread started")
+
+
+# =====================================
+# Local active-contract store
+# =====================================
+
+# State replaced as a whole when a fresh snapshot goes live:
+#   contracts: 'Module:Entity' -> contractId -> contract
+#   index:     ('Module:Entity', field, party) -> sorted [contractId, ...]
+_acs_state: dict | None = None
+_acs_building: dict | None = None
+_acs_connected = False
+_acs_offset: str | None = None
+_acs_lock = threading.Lock()
+_acs_started = False
+# contractIds read from an index per _acs_lock acquisition while paging
+ACS_SCAN_CHUNK = 256
+
+
+def _acs_new() -> dict:
+    return {"contracts": {t: {} for t in ACS_TEMPLATES}, "index": {}}
+
+
+def _acs_template(template_id: str) -> str:
+    """'<pkg>:Module:Entity' -> 'Module:Entity'."""
+    return template_id.split(":", 1)[1] if template_id.count(":") >= 2 else template_id
+
+
+def _acs_add(state: dict, contract: dict):
+    t = _acs_template(contract["templateId"])
+    if t not in state["contracts"]:
+        return
+    cid = contract["contractId"]
+    state["contracts"][t][cid] = contract
+    pld = contract.get("payload", {})
+    for field in ACS_TEMPLATES[t]:
+        party = pld.get(field)
+        if party:
+            bucket = state["index"].setdefault((t, field, party), [])
+            i = bisect.bisect_left(bucket, cid)
+            if i == len(bucket) or bucket[i] != cid:
+                bucket.insert(i, cid)
+
+
+def _acs_remove(state: dict, archived: dict):
+    t = _acs_template(archived["templateId"])
+    contract = state["contracts"].get(t, {}).pop(archived["contractId"], None)
+    if not contract:
+        return
+    pld = contract.get("payload", {})
+    for field in ACS_TEMPLATES[t]:
+        bucket = state["index"].get((t, field, pld.get(field)))
+        if bucket is not None:
+            i = bisect.bisect_left(bucket, contract["contractId"])
+            if i < len(bucket) and bucket[i] == contract["contractId"]:
+                del bucket[i]
+            if not bucket:
+                del state["index"][(t, field, pld.get(field))]
+
+
+def _on_acs_event(kind: str, ev):
+    """Apply one stream event to the active-contract store."""
+    global _acs_state, _acs_building, _acs_connected, _acs_offset
+    with _acs_lock:
+        if kind == "reset":
+            _acs_building = _acs_new()
+        elif kind == "created":
+            _acs_add(_acs_building or _acs_state, ev)
+        elif kind == "archived":
+            _acs_remove(_acs_building or _acs_state, ev)
+        elif kind == "live":
+            _acs_offset = ev
+            _acs_connected = True
+            if _acs_building is not None:
+                _acs_state, _acs_building = _acs_building, None
+                n = sum(len(c) for c in _acs_state["contracts"].values())
+                print(f"[acs] store live at offset {ev}: {n} contracts")
+        elif kind == "disconnected":
+            _acs_connected = False
+
+
+def start_acs_store():
+    """Mirror ACS_TEMPLATES into the local store (once per process)."""
+    global _acs_started
+    if _acs_started or not ACS_ENABLED:
+        return
+    _acs_started = True
+    start_ledger_stream("acs", list(ACS_TEMPLATES), ACS_READ_AS, _on_acs_event)
+
+
+def acs_contracts(
+    template: str, party: str, field: str | None = None, after: str | None = None
+):
+    """
+    Active contracts of a template visible to party (a full Party id), served
+    from the local store in contractId order, starting after the given
+    contractId. With field, only contracts where payload[field] is party.
+    Returns a lazy iterator, or None when the store is not available yet.
+    """
+    start_acs_store()
+    state = _acs_state
+    if state is None or template not in state["contracts"]:
+        return None
+
+    def scan(key):
+        # Walk one sorted index by contractId, a chunk per lock acquisition,
+        # so the stream thread can insert / remove ids in between
+        last = after
+        while True:
+            with _acs_lock:
+                bucket = state["index"].get(key, ())
+                i = bisect.bisect_right(bucket, last) if last else 0
+                chunk = bucket[i : i + ACS_SCAN_CHUNK]
+            yield from chunk
+            if len(chunk) < ACS_SCAN_CHUNK:
+                return
+            last = chunk[-1]
+
+    def rows():
+        fields = (field,) if field else ACS_TEMPLATES[template]
+        contracts = state["contracts"][template]
+        prev = None
+        # A contract can be indexed under several fields (e.g. buyer and
+        # agent are the same party); the merged order makes repeats adjacent
+        for cid in heapq.merge(*(scan((template, f, party)) for f in fields)):
+            if cid == prev:
+                continue
+            prev = cid
+            c = contracts.get(cid)
+            if c is not None:
+                yield c
+
+    return rows()
+
+
+def acs_mirrors(party: str) -> bool:
+    """True if the store streams as party (one of ACS_READ_AS), i.e. holds
+    every contract visible to it."""
+    party_id = get_party_id(party)
+    return any(get_party_id(p) == party_id for p in ACS_READ_AS)
+
+
+def acs_get(template: str, contract_id: str) -> dict | None:
+    """One active contract by id from the local store (None if unknown/not live)."""
+    state = _acs_state
+    if state is None or template not in state["contracts"]:
+        return None
+    return state["contracts"][template].get(contract_id)
+
+
+def lookup_contract(template: str, contract_id: str, read_as: str = "Escrow-1"):
+    """Active contract by id: local store first, then a single /v1/fetch."""
+    contract = acs_get(template, contract_id)
+    if contract is not None:
+        return contract
+    code, data = fetch(tid(template), contract_id, read_as=read_as)
+    if code != 200:
+        return None
+    return data.get("result")
+
+
+def iter_contracts(
+    template: str,
+    party: str,
+    field: str | None = None,
+    read_as: str | None = None,
+    cursor: str | None = None,
+    timeout: float | None = None,
+):
+    """
+    Contracts visible to party in contractId order, starting after cursor.
+    Served from the local store when it is live and streams as the querying
+    party (see acs_mirrors), otherwise from /v1/query.
+
+    Without field, the party's own visibility is the filter (query as party).
+    With field, only contracts where payload[field] == party are returned; the
+    predicate is pushed into the JSON API query, run as read_as (or party).
+
+    Returns (status_code, rows, stale): rows is an iterator on success and the
+    error body otherwise; stale is True when served from the store while its
+    stream is reconnecting.
+    """
+    party_id = get_party_id(party)
+    rows = None
+    if acs_mirrors((read_as or party) if field else party):
+        rows = acs_contracts(template, party_id, field, after=cursor)
+    if rows is not None:
+        return 200, rows, not _acs_connected
+
+    if field:
+        code, data = query(
+            [tid(template)],
+            read_as=read_as or party,
+            filter={field: party_id},
+            timeout=timeout,
+        )
+    else:
+        code, data = query([tid(template)], read_as=party, timeout=timeout)
+    if code != 200:
+        return code, data, False
+    result = sorted(data.get("result", []), key=lambda c: c["contractId"])
+    if cursor:
+        result = [c for c in result if c["contractId"] > cursor]
+    return 200, iter(result), False
+
+
+def read_contracts(
+    template: str,
+    party: str,
+    field: str | None = None,
+    read_as: str | None = None,
+    limit: int | None = None,
+    timeout: float | None = None,
+    cursor: str | None = None,
+):
+    """
+    Drop-in replacement for query() on read endpoints (see iter_contracts).
+    Returns (status_code, {"result": [...]}) like query(), plus "nextCursor"
+    when more than limit contracts are available and "stale" when the store
+    is reconnecting.
+    """
+    code, rows, stale = iter_contracts(
+        template, party, field, read_as=read_as, cursor=cursor, timeout=timeout
+    )
+    if code != 200:
+        return code, rows
+    page = list(rows if limit is None else islice(rows, limit + 1))
+    out = {"result": page, "status": 200}
+    if limit is not None and len(page) > limit:
+        del page[limit:]
+        out["nextCursor"] = page[-1]["contractId"]
+    if stale:
+        out["stale"] = True
+    return 200, out
+
+
+def paged_response(rows, envelope: dict, key: str = "result"):
+    """
+    Serialize an iterator of contracts (or deals) for a list endpoint.
+
+    query args:
+      limit=N       page size; "nextCursor" is set when more rows exist
+      cursor=<cid>  continue after this contractId
+      format=ndjson one JSON object per line, streamed; the first line is
+                    the envelope ({"status": ..., "partial": ..., "stale": ...})
+                    and a final {"nextCursor": ...} line is added when more
+                    rows exist
+      stream=1      the regular JSON document, streamed as it is serialized
+    """
+    limit = request.args.get("limit", type=int)
+    if limit is not None:
+        limit = max(limit, 1)
+    fmt = request.args.get("format", "json")
+    streamed = request.args.get("stream") == "1"
+
+    def rows_page():
+        # Yields (row, next_cursor); next_cursor is set on the last row only
+        # when the page is cut short by limit
+        it = rows if limit is None else islice(rows, limit + 1)
+        prev = None
+        for n, row in enumerate(it):
+            if limit is not None and n == limit:
+                yield prev, prev["contractId"]
+                return
+            if prev is not None:
+                yield prev, None
+            prev = row
+        if prev is not None:
+            yield prev, None
+
+    if fmt == "ndjson":
+
+        def gen_ndjson():
+            yield json.dumps(envelope) + "\n"
+            for row, next_cursor in rows_page():
+                yield json.dumps(row) + "\n"
+                if next_cursor:
+                    yield json.dumps({"nextCursor": next_cursor}) + "\n"
+
+        return Response(gen_ndjson(), mimetype="application/x-ndjson")
+
+    if streamed:
+
+        def gen_json():
+            head = json.dumps(envelope)[:-1]
+            yield (head + ", " if envelope else "{") + json.dumps(key) + ": ["
+            next_cursor = None
+            for n, (row, nc) in enumerate(rows_page()):
+                yield ("" if n == 0 else ", ") + json.dumps(row)
+                next_cursor = nc or next_cursor
+            tail = f', "nextCursor": {json.dumps(next_cursor)}' if next_cursor else ""
+            yield "]" + tail + "}"
+
+        return Response(gen_json(), mimetype="application/json")
+
+    out = dict(envelope)
+    out[key] = []
+    for row, next_cursor in rows_page():
+        out[key].append(row)
+        if next_cursor:
+            out["nextCursor"] = next_cursor
+    return jsonify(out), 200
+
+
+def list_contracts(template: str, party: str):
+    """Paged / streamed list endpoint body for one template (see paged_response)."""
+    code, rows, stale = iter_contracts(
+        template, party, cursor=request.args.get("cursor")
+    )
+    if code != 200:
+        return jsonify(rows), code
+    envelope = {"status": 200}
+    if stale:
+        envelope["stale"] = True
+    return paged_response(rows, envelope)
+
 
-            # Also map shortened alias without namespace, e.g. "Alice-1"
-            short = ident.split("::", 1)[0]
-            cache[short] = ident
+def bridge_after_canton(escrow_cid: str, action: str):
+    """
+    Mirror a Canton release / refund of escrow_cid on Ethereum: record the
+    deal status and queue the matching bridge job.
+    """
+    deal_id_hex = "0x" + Web3.keccak(text=escrow_cid).hex()
+    deal_map_put(
+        deal_id_hex, escrow_cid, "released" if action == "release" else "refunded"
+    )
+    return enqueue_bridge_job(action, escrow_cid=escrow_cid)
 
-        _party_cache = cache
-        print("[i] Party cache refreshed from JSON API:", _party_cache)
 
-    except Exception as e:
-        print("[i] Could not refresh party cache from JSON API:", e)
+# (response key, template, acting payload field, choice, trace span)
+ESCROW_SETTLEMENT_STEPS = (
+    ("buyer_confirm", "Escrow:Escrow", "buyer", "BuyerConfirm", "buyer_confirm"),
+    ("seller_confirm", "Escrow:Pending", "seller", "SellerConfirm", "seller_confirm"),
+    ("release", "Escrow:Ready", "agent", "ReleaseToSeller", "release_to_seller"),
+)
 
 
-def get_party_id(name: str) -> str:
+def run_escrow_settlement(escrow_cid: str, start: int = 0):
     """
-    Resolve a human name (e.g. 'Alice-1') to a full Party identifier.
-
-    If name is already a full Party id (contains '::'), it is returned as-is.
-    If not found in the cache, we fall back to the original name (demo mode).
+    BuyerConfirm -> SellerConfirm -> ReleaseToSeller for one Escrow, each step
+    exercising the contract returned by the previous one (no queries, so
+    concurrent deals never get mixed up). With start > 0, escrow_cid is the
+    contract of that step (e.g. the Pending of a retried settlement).
+
+    Returns (status_code, steps): steps maps each response key to its choice
+    response, up to and including the first failing step; it is empty (404)
+    when the contract is not active.
     """
-    if "::" in name or name.startswith("party-"):
-        return name
+    with trace_span("fetch_escrow", escrow_cid=escrow_cid):
+        escrow = lookup_contract(ESCROW_SETTLEMENT_STEPS[start][1], escrow_cid)
+    if not escrow:
+        return 404, {}
+    pld = escrow["payload"]
+
+    steps = {}
+    cid = escrow_cid
+    for key, template, actor, choice, span in ESCROW_SETTLEMENT_STEPS[start:]:
+        with trace_span(span):
+            code, data = exercise(tid(template), cid, pld[actor], choice)
+        steps[key] = data
+        if code != 200:
+            return code, steps
+        cid = data["result"]["exerciseResult"]
+    return 200, steps
+
+
+class SettlementFailed(RuntimeError):
+    """A Canton settlement step failed; start / cid say where to resume."""
+
+    def __init__(self, message: str, start: int, cid: str):
+        super().__init__(message)
+        self.start = start
+        self.cid = cid
+
+
+@trace_flow("settle_canton_escrow")
+def settle_canton_escrow(escrow_cid: str, start: int = 0, cid: str | None = None):
+    """
+    Settle a deposited deal: the full Canton Escrow flow for the given
+    contract (run_escrow_settlement), then the Ethereum release job.
+    start / cid resume a failed settlement at that step's contract.
 
-    if not _party_cache:
-        refresh_party_cache_from_ledger()
+    Raises SettlementFailed when a step (or the contract lookup) fails.
+    """
+    cid = cid or escrow_cid
+    print(f"[canton] settling escrow {escrow_cid}")
 
-    if name in _party_cache:
-        return _party_cache[name]
+    code, steps = run_escrow_settlement(cid, start)
+    if not steps:
+        raise SettlementFailed(f"contract {cid} not found (HTTP {code})", start, cid)
+    if code != 200:
+        *done, step = steps
+        if done:
+            start += len(done)
+            cid = steps[done[-1]]["result"]["exerciseResult"]
+        raise SettlementFailed(f"{step} failed: {steps[step]}", start, cid)
+    print("[canton] escrow released successfully:", steps["release"])
 
-    print(f"WARNING: party '{name}' not found in cache, using as-is")
-    return name
+    # Reverse direction: after Canton release, trigger Ethereum release
+    try:
+        with trace_span("enqueue_eth_release"):
+            eth_release = bridge_after_canton(escrow_cid, "release")
+        print("[bridge] eth release queued:", eth_release)
+    except Exception as e:
+        print("[bridge] eth release error:", e)
 
 
 # =====================================
-# JSON API wrappers: query / create / exercise / fetch
+# Settlement executor
 # =====================================
 
+# Deal statuses after which a Deposited event needs no settlement
+SETTLED_STATUSES = ("released", "refunded", "eth_released", "eth_refunded")
 
-def query(template_ids, read_as: str):
-    """Call /v1/query with readAs permissions."""
-    party = get_party_id(read_as)
-    token = make_jwt(read_as=[party])
-    payload = {"templateIds": template_ids, "query": {}}
-    return http_post("/query", payload, token=token)
-
+SETTLE_WORKERS = int(os.environ.get("SETTLE_WORKERS", "4"))
+SETTLE_QUEUE_SIZE = int(os.environ.get("SETTLE_QUEUE_SIZE", "100"))
+SETTLE_MAX_ATTEMPTS = int(os.environ.get("SETTLE_MAX_ATTEMPTS", "5"))
 
-def create(template_id: str, payload: dict, act_as_party: str):
-    party = get_party_id(act_as_party)
-    token = make_jwt(act_as=[party])
-    body = {"templateId": template_id, "payload": payload}
-    return http_post("/create", body, token=token)
+# One bounded FIFO lane per worker; a deal always maps to the same lane, so
+# events of one deal are settled in order while different deals run in
+# parallel. A full lane blocks the watcher (backpressure).
+_settle_lanes: list[queue.Queue] = []
+_settle_seen: OrderedDict[str, None] = OrderedDict()
+_settle_seen_lock = threading.Lock()
+_settle_started = False
 
 
-def exercise(
-    template_id: str, contract_id: str, act_as_party: str, choice: str, argument=None
-):
-    party = get_party_id(act_as_party)
-    token = make_jwt(act_as=[party])
-    body = {
-        "templateId": template_id,
-        "contractId": contract_id,
-        "choice": choice,
-        "argument": argument or {},
-    }
-    return http_post("/exercise", body, token=token)
+def settle_worker(lane: queue.Queue):
+    while True:
+        deal_id_hex, escrow_cid, attempt, start, cid = lane.get()
+        try:
+            settle_canton_escrow(escrow_cid, start, cid)
+            continue
+        except SettlementFailed as e:
+            error, start, cid = e, e.start, e.cid
+        except Exception as e:
+            error = e
+        if attempt + 1 < SETTLE_MAX_ATTEMPTS:
+            # The deal stays in _settle_seen: repeated events are still
+            # dropped while its retry is pending
+            delay = 5 * (attempt + 1)
+            print(f"[settle] {deal_id_hex} failed ({error}), retry in {delay}s")
+            item = (deal_id_hex, escrow_cid, attempt + 1, start, cid)
+            timer = threading.Timer(delay, lane.put, args=(item,))
+            timer.daemon = True
+            timer.start()
+            continue
+        print(f"[settle] {deal_id_hex} failed after {attempt + 1} attempts:", error)
+        deal_map_put(deal_id_hex, escrow_cid, "settle_failed")
+        with _settle_seen_lock:
+            _settle_seen.pop(deal_id_hex, None)  # a later event may retry it
 
 
-def fetch(template_id: str, contract_id: str, read_as: str):
-    """Call /v1/fetch to retrieve a single contract by contractId."""
-    party = get_party_id(read_as)
-    token = make_jwt(read_as=[party])
-    body = {"templateId": template_id, "contractId": contract_id}
-    return http_post("/fetch", body, token=token)
+def start_settlement_executor():
+    """
+    Start SETTLE_WORKERS settlement lanes (once per process) and requeue deals
+    that were deposited but not settled before the last shutdown.
+    """
+    global _settle_started
+    if _settle_started:
+        return
+    _settle_started = True
+    for _ in range(SETTLE_WORKERS):
+        lane: queue.Queue = queue.Queue(maxsize=SETTLE_QUEUE_SIZE)
+        _settle_lanes.append(lane)
+        threading.Thread(target=settle_worker, args=(lane,), daemon=True).start()
+    print(f"[settle] {SETTLE_WORKERS} settlement workers started")
+
+    # The backlog can exceed the lanes' capacity; requeue it off the caller's
+    # thread so a full lane does not block startup
+    threading.Thread(target=requeue_deposited, daemon=True).start()
+
+
+def requeue_deposited():
+    """Queue deal_map rows left in 'deposited' for settlement."""
+    rows = (
+        bridge_db()
+        .execute("SELECT deal_id, escrow_cid FROM deal_map WHERE status = 'deposited'")
+        .fetchall()
+    )
+    queued = sum(submit_settlement(r["deal_id"], r["escrow_cid"]) for r in rows)
+    if queued:
+        print(f"[settle] requeued {queued} deposited deals")
 
 
-def settle_canton_escrow(escrow_cid: str):
+def submit_settlement(deal_id_hex: str, escrow_cid: str) -> bool:
     """
-    Perform the full Canton Escrow settlement flow for a given contract:
-    BuyerConfirm -> SellerConfirm -> ReleaseToSeller.
+    Queue a deposited deal for Canton settlement. Repeated events for a deal
+    that is queued or already settled by this process are dropped.
+    Blocks while the deal's lane is full. Returns True if queued.
     """
-    print(f"[canton] settling escrow {escrow_cid}")
+    start_settlement_executor()
+    with _settle_seen_lock:
+        if deal_id_hex in _settle_seen:
+            return False
+        _settle_seen[deal_id_hex] = None
+        while len(_settle_seen) > 100_000:
+            _settle_seen.popitem(last=False)
 
-    # 1) BuyerConfirm on the Escrow
-    c1, d1 = exercise(tid("Escrow:Escrow"), escrow_cid, "Alice-1", "BuyerConfirm")
-    if c1 != 200:
-        print("[canton] BuyerConfirm failed:", d1)
-        return
+    lane = _settle_lanes[zlib.crc32(deal_id_hex.encode()) % len(_settle_lanes)]
+    lane.put((deal_id_hex, escrow_cid, 0, 0, None))
+    return True
+
+
+# StablecoinEscrow events followed by the watcher
+BRIDGE_EVENTS = ("Deposited", "Released", "Refunded")
+
+
+def _event_topic(name: str) -> bytes:
+    """topic0 of an ESCROW_ABI event, e.g. keccak('Deposited(bytes32,address,uint256)')."""
+    abi = next(e for e in ESCROW_ABI if e["type"] == "event" and e["name"] == name)
+    sig = f"{name}({','.join(i['type'] for i in abi['inputs'])})"
+    return bytes(Web3.keccak(text=sig))
+
+
+def load_watch_cursor() -> int | None:
+    """Last block fully processed by the watcher, or None on first start."""
+    row = (
+        bridge_db()
+        .execute("SELECT block FROM bridge_cursor WHERE name = 'escrow-events'")
+        .fetchone()
+    )
+    return row["block"] if row else None
+
+
+def save_watch_cursor(block: int):
+    bridge_db().execute(
+        "INSERT INTO bridge_cursor (name, block, updated_at)"
+        " VALUES ('escrow-events', ?, ?) ON CONFLICT (name) DO UPDATE SET"
+        " block = excluded.block, updated_at = excluded.updated_at",
+        (block, time.time()),
+    )
 
-    # 2) Find the Pending contract and call SellerConfirm
-    c2, d2 = query([tid("Escrow:Pending")], read_as="Bob-1")
-    if c2 == 200 and d2.get("result"):
-        pending_cid = d2["result"][0]["contractId"]
-        c2x, d2x = exercise(
-            tid("Escrow:Pending"), pending_cid, "Bob-1", "SellerConfirm"
-        )
-        if c2x != 200:
-            print("[canton] SellerConfirm failed:", d2x)
-            return
-    else:
-        print("[canton] no Pending found for escrow settlement")
-        return
 
-    # 3) Find Ready and call ReleaseToSeller, then bridge to Ethereum
-    c3, d3 = query([tid("Escrow:Ready")], read_as="Escrow-1")
-    if c3 == 200 and d3.get("result"):
-        ready_cid = d3["result"][0]["contractId"]
-        c3x, d3x = exercise(
-            tid("Escrow:Ready"), ready_cid, "Escrow-1", "ReleaseToSeller"
+def handle_escrow_event(name: str, args):
+    """React to one decoded StablecoinEscrow event."""
+    deal_id_hex = "0x" + args["dealId"].hex()
+    escrow_cid = deal_map_get(deal_id_hex)
+
+    if name == "Deposited":
+        print(
+            f"[eth-watch] Deposited: dealId={deal_id_hex}, buyer={args.get('buyer')}, amount={args.get('amount')}"
         )
-        if c3x == 200:
-            print("[canton] escrow released successfully:", d3x)
+        if not escrow_cid:
+            print("[eth-watch] no escrow_cid mapping for that dealId, skipping")
+            return
+        if deal_map_status(deal_id_hex) in SETTLED_STATUSES:
+            print(f"[eth-watch] deal {deal_id_hex} already settled, skipping")
+            return
+        deal_map_put(deal_id_hex, escrow_cid, "deposited")
 
-            # Reverse direction: after Canton release, trigger Ethereum release
-            try:
-                eth_release = bridge_release_eth_from_canton(escrow_cid)
-                print("[bridge] eth release result:", eth_release)
-            except Exception as e:
-                print("[bridge] eth release error:", e)
+        # Hand over to the settlement executor (blocks when it is saturated)
+        submit_settlement(deal_id_hex, escrow_cid)
 
-        else:
-            print("[canton] ReleaseToSeller failed:", d3x)
-    else:
-        print("[canton] no Ready found for escrow settlement")
+    elif escrow_cid:
+        # Released / Refunded: record the final on-chain state
+        print(f"[eth-watch] {name}: dealId={deal_id_hex}")
+        deal_map_put(deal_id_hex, escrow_cid, f"eth_{name.lower()}")
 
 
 def eth_deposit_watcher():
     """
-    Watch Deposited events on the StablecoinEscrow contract.
-    For each matching dealId with a known mapping, trigger settle_canton_escrow.
+    Follow Deposited / Released / Refunded events of the StablecoinEscrow
+    contract with eth_getLogs over block ranges.
+
+    The last processed block is checkpointed in the bridge DB, so deposits
+    made while the service was down are picked up on restart; it never moves
+    past a log whose handler failed. Only blocks
+    ETH_CONFIRMATIONS behind the head are scanned (reorg safety), and the
+    range size adapts between ETH_LOG_RANGE_MIN and ETH_LOG_RANGE_MAX when
+    the node rejects a range or returns few logs.
     """
     if not w3 or not w3.is_connected():
         print("[eth-watch] web3 not connected, watcher not started")
         return
 
-    try:
-        # Event name must match the contract definition: Deposited
-        event_klass = escrow_contract.events.Deposited
-    except AttributeError:
-        print("[eth-watch] Contract has no event 'Deposited'. Check ABI / event name.")
-        return
+    topics = {_event_topic(name): name for name in BRIDGE_EVENTS}
 
     try:
-        current_block = w3.eth.block_number
-        deposit_filter = event_klass.create_filter(from_block=current_block)
+        last = load_watch_cursor()
+        if last is None:
+            last = (
+                ETH_WATCH_START_BLOCK - 1
+                if ETH_WATCH_START_BLOCK is not None
+                else w3.eth.block_number - ETH_CONFIRMATIONS
+            )
     except Exception as e:
-        print("[eth-watch] could not create filter:", e)
+        print("[eth-watch] could not determine start block:", e)
         return
 
-    print(f"[eth-watch] watching Deposited events from block {current_block}...")
+    print(f"[eth-watch] watching escrow events after block {last}...")
+    span = ETH_LOG_RANGE_MAX
 
     while True:
         try:
-            for ev in deposit_filter.get_new_entries():
-                args = ev["args"]
-                deal_id_bytes = args["dealId"]
-                deal_id_hex = "0x" + deal_id_bytes.hex()
-                buyer = args.get("buyer")
-                amount = args.get("amount")
-
-                print(
-                    f"[eth-watch] Deposited: dealId={deal_id_hex}, buyer={buyer}, amount={amount}"
-                )
-
-                escrow_cid = deal_map.get(deal_id_hex)
-                if not escrow_cid:
-                    print("[eth-watch] no escrow_cid mapping for that dealId, skipping")
+            safe_head = w3.eth.block_number - ETH_CONFIRMATIONS
+            while last < safe_head:
+                to_block = min(last + span, safe_head)
+                try:
+                    logs = w3.eth.get_logs(
+                        {
+                            "address": SEPOLIA_ESCROW_ADDRESS,
+                            "fromBlock": last + 1,
+                            "toBlock": to_block,
+                            "topics": [list(topics)],
+                        }
+                    )
+                except Exception as e:
+                    if span <= ETH_LOG_RANGE_MIN:
+                        raise
+                    span = max(span // 2, ETH_LOG_RANGE_MIN)
+                    print(f"[eth-watch] getLogs failed ({e}), range -> {span} blocks")
                     continue
 
-                # Trigger the Canton settlement flow
-                settle_canton_escrow(escrow_cid)
+                # On a handler failure the cursor stops before that log's
+                # block, which is rescanned on the next poll (handlers are
+                # idempotent, so the logs before it may be seen twice)
+                failed_block = None
+                for log in logs:
+                    name = topics.get(bytes(log["topics"][0]))
+                    if not name:
+                        continue
+                    try:
+                        ev = getattr(escrow_contract.events, name)().process_log(log)
+                        handle_escrow_event(name, ev["args"])
+                    except Exception as e:
+                        print(f"[eth-watch] {name} handling failed:", e)
+                        failed_block = log["blockNumber"]
+                        break
+
+                done = to_block if failed_block is None else failed_block - 1
+                if done > last:
+                    # The 'deposited' rows must be on disk before the cursor
+                    # passes their events (requeue_deposited reads them)
+                    deal_map_flush()
+                    save_watch_cursor(done)
+                    last = done
+                if failed_block is not None:
+                    print(f"[eth-watch] will rescan from block {last + 1}")
+                    break
+                if to_block < safe_head:
+                    print(
+                        f"[eth-watch] caught up to block {to_block} / {safe_head} ({len(logs)} events)"
+                    )
+                if len(logs) < 1000:
+                    span = min(span * 2, ETH_LOG_RANGE_MAX)
 
         except Exception as e:
             print("[eth-watch] error in loop:", e)
 
-        time.sleep(5)
+        time.sleep(ETH_WATCH_POLL)
 
 
 def start_eth_deposit_watcher():
@@ -778,47 +3036,117 @@ def start_eth_deposit_watcher():
 @app.get("/status")
 def status():
     try:
-        r = requests.get(f"{BASE_URL}/readyz", timeout=5)
+        r = ledger_session().get(f"{BASE_URL}/readyz", timeout=5)
         ok = r.status_code == 200
         return {
             "ok": ok,
             "api": API_URL,
             "base_url": BASE_URL,
             "body": r.text.strip(),
+            "http": ledger_http_stats(),
         }, (200 if ok else 503)
     except Exception as e:
         return {"ok": False, "api": API_URL, "error": str(e)}, 503
 
 
+@app.get("/metrics")
+def metrics():
+    return Response(render_metrics(), mimetype="text/plain; version=0.0.4")
+
+
+@app.post("/packages/reload")
+def packages_reload():
+    """
+    Switch the server to a new package version.
+    body: raw DAR bytes (uploaded to the participant first), or empty to
+    re-read the latest DAR under .daml/dist.
+    """
+    try:
+        pkg = reload_package(request.get_data() or None)
+    except Exception as e:
+        return {"error": str(e)}, 500
+    return {"packageId": pkg, "templates": dict(_tid_table)}, 200
+
+
 @app.get("/eth/status")
 def eth_status():
-    ok = w3.is_connected()
+    """
+    Chain connectivity and contract metadata, answered from the in-memory
+    cache (see refresh_eth_meta). "age" is the seconds since the last
+    successful refresh; "stale" is set when that is old or the last
+    refresh failed.
+    """
+    meta = eth_meta()
     info = {
-        "connected": ok,
+        "connected": meta.get("connected", False),
         "rpc_url": ETH_RPC_URL,
         "escrow_address": SEPOLIA_ESCROW_ADDRESS,
         "token_address": SEPOLIA_TOKEN_ADDRESS,
+        **meta,
     }
-    if not ok:
-        info["error"] = "Web3 not connected"
+    if meta.get("refreshed_at") is None:
+        info["error"] = meta.get("last_error") or "metadata not loaded"
         return info, 503
+    return info, 200
+
+
+@app.get("/eth/tx/<tx_hash>")
+def eth_tx(tx_hash):
+    st = tx_status(tx_hash)
+    if st is None:
+        return {"error": "unknown transaction"}, 404
+    return {"tx_hash": tx_hash, **st}, 200
+
 
+@app.post("/eth/deals")
+def eth_deals_view():
+    """
+    On-chain state of many deals at once (batched reads, see eth_deals).
+    body: {"deal_ids": ["0x..."], "escrow_cids": ["..."], "max_age": 5}
+    Escrow contract ids are mapped to their deterministic dealId.
+    """
+    body = request.json or {}
+    ids = list(body.get("deal_ids", []))
+    by_deal = {}
+    for cid in body.get("escrow_cids", []):
+        deal_id_hex = "0x" + Web3.keccak(text=cid).hex()
+        by_deal[deal_id_hex] = cid
+        ids.append(deal_id_hex)
+    max_age = float(body.get("max_age", ETH_DEALS_CACHE_TTL))
     try:
-        broker = escrow_contract.functions.broker().call()
-        symbol = token_contract.functions.symbol().call()
-        decimals = token_contract.functions.decimals().call()
+        deals = eth_deals(ids, max_age=max_age)
+    except ValueError as e:
+        return {"error": f"bad dealId: {e}"}, 400
     except Exception as e:
-        info["error"] = f"contract call failed: {e}"
-        return info, 500
+        return {"error": str(e)}, 503
+    result = []
+    for deal_id_hex, deal in deals.items():
+        row = {"dealId": deal_id_hex}
+        if deal_id_hex in by_deal:
+            row["escrow_cid"] = by_deal[deal_id_hex]
+        if deal is None:
+            row["error"] = "read failed"
+        else:
+            row.update(deal)
+        result.append(row)
+    return jsonify({"result": result}), 200
 
-    info.update(
-        {
-            "broker": broker,
-            "token_symbol": symbol,
-            "token_decimals": decimals,
-        }
-    )
-    return info, 200
+
+@app.get("/bridge/jobs/<job_id>")
+def bridge_job_status(job_id):
+    job = get_bridge_job(job_id)
+    if job is None:
+        return {"error": "unknown job"}, 404
+    return jsonify(job), 200
+
+
+@app.get("/bridge/deals/<escrow_cid>")
+def bridge_deal_for_escrow(escrow_cid):
+    deal_map_flush()
+    row = deal_map_by_escrow(escrow_cid)
+    if row is None:
+        return {"error": "no Ethereum deal for that escrow"}, 404
+    return jsonify(row), 200
 
 
 @app.get("/eth/test_create_deal")
@@ -826,7 +3154,7 @@ def eth_test_create_deal():
     """
     Simple test: create a StablecoinEscrow deal on Ethereum.
     buyer & seller = the broker address (for demo only).
-    amount = 1 mUSDT (1,000,000 units, decimals=6).
+    amount = 1 mUSDT.
     """
     if not w3.is_connected():
         return {"error": "web3 not connected"}, 503
@@ -838,9 +3166,8 @@ def eth_test_create_deal():
 
     buyer = eth_broker_account.address
     seller = eth_broker_account.address
-    amount = 1_000_000  # 1 mUSDT
-
     try:
+        amount = 10 ** token_decimals()  # 1 mUSDT
         fn = escrow_contract.functions.createDeal(
             deal_id_bytes,
             buyer,
@@ -863,35 +3190,33 @@ def eth_test_create_deal():
 # Simple read-only endpoints
 # =====================================
 
+# Party roles on Escrow / Pending / Ready / Offer contracts
+DEAL_ROLES = ("buyer", "seller", "agent")
+
 
 @app.get("/cash/<party>")
 def cash(party):
-    code, data = query([tid("Token:Cash")], read_as=party)
-    return jsonify(data), code
+    return list_contracts("Token:Cash", party)
 
 
 @app.get("/escrow/<party>")
 def list_escrow(party):
-    code, data = query([tid("Escrow:Escrow")], read_as=party)
-    return jsonify(data), code
+    return list_contracts("Escrow:Escrow", party)
 
 
 @app.get("/pending/<party>")
 def list_pending(party):
-    code, data = query([tid("Escrow:Pending")], read_as=party)
-    return jsonify(data), code
+    return list_contracts("Escrow:Pending", party)
 
 
 @app.get("/ready/<party>")
 def list_ready(party):
-    code, data = query([tid("Escrow:Ready")], read_as=party)
-    return jsonify(data), code
+    return list_contracts("Escrow:Ready", party)
 
 
 @app.get("/completed/<party>")
 def list_completed(party):
-    code, data = query([tid("Escrow:Completed")], read_as=party)
-    return jsonify(data), code
+    return list_contracts("Escrow:Completed", party)
 
 
 # =====================================
@@ -901,7 +3226,7 @@ def list_completed(party):
 
 @app.get("/deal_summary")
 def deal_summary():
-    code, data = query([tid("Escrow:Escrow")], read_as="Alice-1")
+    code, data = read_contracts("Escrow:Escrow", "Alice-1")
     if code != 200 or not data.get("result"):
         return jsonify({"error": "no deals"}), 404
 
@@ -977,11 +3302,19 @@ def offer_create():
 def list_offers_for_party(seller: str):
     """
     List all active Escrow:Offer contracts for a given seller.
-    Uses /v1/query which returns only active (non-archived) contracts.
+    Served from the local active-contract store (falls back to /v1/query,
+    which returns only active (non-archived) contracts).
+    query args: role=seller|buyer|agent (default seller), limit=N
     """
     seller_pid = get_party_id(seller)
+    role = request.args.get("role", "seller")
+    if role not in DEAL_ROLES:
+        return {"error": f"role must be one of {', '.join(DEAL_ROLES)}"}, 400
+    limit = request.args.get("limit", type=int)
 
-    code, data = query([tid("Escrow:Offer")], read_as="Escrow-1")
+    code, data = read_contracts(
+        "Escrow:Offer", seller, field=role, read_as="Escrow-1", limit=limit
+    )
     if code != 200:
         return jsonify(data), code
 
@@ -989,10 +3322,6 @@ def list_offers_for_party(seller: str):
 
     for c in data.get("result", []):
         pld = c["payload"]
-
-        if pld.get("seller") != seller_pid:
-            continue
-
         offers.append(
             {
                 "contractId": c["contractId"],
@@ -1010,126 +3339,82 @@ def list_offers_for_party(seller: str):
 
 
 @app.post("/offer_accept")
+@traced("offer_accept")
 def offer_accept():
     """
     Seller accepts an Offer:
-      1) Fetch Escrow:Offer from the ledger
-      2) Archive it (treated as acceptance)
-      3) Create Cash + Escrow on Canton
-      4) Create a parallel StablecoinEscrow deal on Ethereum
+      1) Look up Escrow:Offer (local contract store, else /v1/fetch)
+      2) Exercise Offer.AcceptAndFund as agent + bank + buyer: archives the
+         offer, issues and locks the buyer's Cash and opens the Escrow in a
+         single transaction
+      3) Queue the parallel StablecoinEscrow createDeal; eth_bridge carries
+         the jobId (poll /bridge/jobs/<jobId>) and the deterministic dealId
     """
     body = request.json or {}
     offer_cid = body.get("offer_cid")
     if not offer_cid:
         return {"error": "offer_cid is required"}, 400
 
-    # 1) fetch Offer
-    c_fetch, r_fetch = fetch(tid("Escrow:Offer"), offer_cid, read_as="Escrow-1")
-    if c_fetch != 200 or "result" not in r_fetch:
+    # 1) look up the Offer
+    with trace_span("fetch_offer", offer_cid=offer_cid):
+        offer = lookup_contract("Escrow:Offer", offer_cid)
+    if not offer:
         return {
             "step": "fetch_offer",
-            "response": r_fetch,
+            "offer_cid": offer_cid,
             "error": "Offer not found",
         }, 404
 
-    offer = r_fetch["result"]
     pld = offer["payload"]
+    # Same {status, result} envelope as a /v1/fetch response
+    offer_resp = {"status": 200, "result": offer}
 
-    agent = pld["agent"]
     buyer_pid = pld["buyer"]
-    seller_pid = pld["seller"]
     cc_amount = float(pld["ccAmount"])
     unit_price = float(pld["unitPrice"])
     total_price = float(pld["totalPrice"])
     buyer_eth = pld["buyerEth"]
     seller_eth = pld["sellerEth"]
 
-    # 2) Archive the offer using the built-in Archive choice, via Escrow-1 (signatory)
-    c_accept, r_accept = exercise(
-        tid("Escrow:Offer"),
-        offer_cid,
-        act_as_party="Escrow-1",
-        choice="Archive",
-    )
-    if c_accept != 200:
-        return {
-            "step": "archive_offer",
-            "offer": r_fetch,
-            "archive": r_accept,
-        }, c_accept
-
-    # 3) Create the Cash + Escrow flow (similar to /create_deal)
-
-    buyer = buyer_pid
-    seller = seller_pid
-    bank = get_party_id("Bank-1")
-    agent_pid = get_party_id("Escrow-1")
-
-    # 3a) Bank issues Cash for the buyer
-    cash_payload = {
-        "issuer": bank,
-        "owner": buyer,
-        "currency": "USD",
-        "amount": total_price,
-    }
-    c1, r1 = create(tid("Token:Cash"), cash_payload, act_as_party="Bank-1")
-    if c1 != 200:
-        return (
-            jsonify(
-                {
-                    "step": "create_cash",
-                    "offer": r_fetch,
-                    "accept": r_accept,
-                    "response": r1,
-                }
-            ),
-            c1,
+    # 2) Accept and fund in one transaction
+    item_desc = f"CantonCoin (CC) x {cc_amount} @ {unit_price} USDT"
+    with trace_span("accept_and_fund"):
+        c_accept, r_accept = exercise_as(
+            tid("Escrow:Offer"),
+            offer_cid,
+            act_as=["Escrow-1", "Bank-1", buyer_pid],
+            choice="AcceptAndFund",
+            argument={"bank": get_party_id("Bank-1"), "item": item_desc},
         )
-
-    cash_cid = r1["result"]["contractId"]
-
-    # 3b) Buyer transfers funds to the escrow agent (Escrow-1)
-    c2, r2 = exercise(
-        tid("Token:Cash"),
-        cash_cid,
-        act_as_party=buyer,
-        choice="Transfer",
-        argument={"newOwner": agent_pid},
-    )
-    if c2 != 200:
+    if c_accept != 200:
         return (
             jsonify(
                 {
-                    "step": "lock_cash",
-                    "offer": r_fetch,
-                    "accept": r_accept,
-                    "response": r2,
+                    "step": "accept_and_fund",
+                    "offer": offer_resp,
+                    "response": r_accept,
                 }
             ),
-            c2,
+            c_accept,
         )
 
-    locked_cid = r2["result"]["exerciseResult"]
-
-    # 3c) Agent creates the Escrow with locked Cash
-    item_desc = f"CantonCoin (CC) x {cc_amount} @ {unit_price} USDT"
-    escrow_payload = {
-        "agent": agent_pid,
-        "buyer": buyer,
-        "seller": seller,
-        "item": item_desc,
-        "price": total_price,
-        "locked": locked_cid,
-    }
-    c3, r3 = create(tid("Escrow:Escrow"), escrow_payload, act_as_party="Escrow-1")
+    escrow = funded_escrow(r_accept)
 
+    # 3) Mirror the deal on Ethereum
     eth_bridge = None
-    if c3 == 200 and buyer_eth and seller_eth:
+    if buyer_eth and seller_eth:
         try:
-            escrow_cid = r3["result"]["contractId"]
-            eth_bridge = bridge_create_eth_deal_from_canton(
-                escrow_cid, buyer_eth, seller_eth, total_price
-            )
+            escrow_cid = escrow["result"]["contractId"]
+            with trace_span("enqueue_eth_create_deal"):
+                eth_bridge = enqueue_bridge_job(
+                    "createDeal",
+                    escrow_cid=escrow_cid,
+                    buyer_eth=buyer_eth,
+                    seller_eth=seller_eth,
+                    price=total_price,
+                )
+            # Deterministic, known before the job runs (see /bridge/jobs/<jobId>)
+            eth_bridge["dealId"] = "0x" + Web3.keccak(text=escrow_cid).hex()
         except Exception as e:
             eth_bridge = {"error": str(e)}
 
@@ -1137,15 +3422,13 @@ def offer_accept():
         jsonify(
             {
                 "step": "offer_accepted",
-                "offer": r_fetch,
+                "offer": offer_resp,
                 "accept": r_accept,
-                "create_cash": r1,
-                "lock_cash": r2,
-                "escrow": r3,
+                "escrow": escrow,
                 "eth_bridge": eth_bridge,
             }
         ),
-        c3,
+        200,
     )
 
 
@@ -1212,11 +3495,11 @@ def offer_reject():
     )
 
 
-@app.post("/create_deal")
-def create_deal():
+def open_deal(body: dict):
     """
     Create a new Escrow deal on Canton,
     and optionally mirror it as a StablecoinEscrow deal on Ethereum.
+    Returns (status_code, response dict).
     body: {
       "buyer": "Alice-1",
       "seller": "Bob-1",
@@ -1226,7 +3509,6 @@ def create_deal():
       "seller_eth": "0x...."   # optional
     }
     """
-    body = request.json or {}
     buyer_name = body.get("buyer", "Alice-1")
     seller_name = body.get("seller", "Bob-1")
     item = body.get("item", "Laptop")
@@ -1235,153 +3517,245 @@ def create_deal():
     buyer_eth = body.get("buyer_eth")
     seller_eth = body.get("seller_eth")
 
-    buyer = get_party_id(buyer_name)
-    seller = get_party_id(seller_name)
-    bank = get_party_id("Bank-1")
-    agent = get_party_id("Escrow-1")
-
-    # 1) Bank issues Cash for the buyer
-    cash_payload = {"issuer": bank, "owner": buyer, "currency": "USD", "amount": price}
-    c1, r1 = create(tid("Token:Cash"), cash_payload, act_as_party="Bank-1")
-    if c1 != 200:
-        return jsonify({"step": "create cash", "response": r1}), c1
-
-    cash_cid = r1["result"]["contractId"]
-
-    # 2) Buyer transfers funds to the escrow agent (Escrow-1)
-    c2, r2 = exercise(
-        tid("Token:Cash"), cash_cid, buyer_name, "Transfer", {"newOwner": agent}
-    )
-    if c2 != 200:
-        return jsonify({"step": "lock cash", "response": r2}), c2
-
-    locked_cid = r2["result"]["exerciseResult"]
+    with trace_span("resolve_parties"):
+        buyer = get_party_id(buyer_name)
+        seller = get_party_id(seller_name)
+        bank = get_party_id("Bank-1")
+        agent = get_party_id("Escrow-1")
 
-    # 3) Agent creates the Escrow with locked Cash
-    escrow_payload = {
+    # Bank issues the buyer's Cash, the buyer locks it with the agent and the
+    # agent opens the Escrow: one create-and-exercise, one transaction.
+    funding_payload = {
         "agent": agent,
+        "bank": bank,
         "buyer": buyer,
         "seller": seller,
         "item": item,
         "price": price,
-        "locked": locked_cid,
     }
-    c3, r3 = create(tid("Escrow:Escrow"), escrow_payload, act_as_party="Escrow-1")
+    with trace_span("fund_escrow"):
+        c1, r1 = create_and_exercise(
+            tid("Escrow:EscrowFunding"),
+            funding_payload,
+            act_as=["Escrow-1", "Bank-1", buyer_name],
+            choice="Fund",
+        )
+    if c1 != 200:
+        return c1, {"step": "fund escrow", "response": r1}
+
+    escrow = funded_escrow(r1)
 
     eth_bridge = None
-    if c3 == 200 and buyer_eth and seller_eth:
+    if buyer_eth and seller_eth:
         try:
-            escrow_cid = r3["result"]["contractId"]
-            eth_bridge = bridge_create_eth_deal_from_canton(
-                escrow_cid,
-                buyer_eth,
-                seller_eth,
-                price,
-            )
+            escrow_cid = escrow["result"]["contractId"]
+            with trace_span("enqueue_eth_create_deal"):
+                eth_bridge = enqueue_bridge_job(
+                    "createDeal",
+                    escrow_cid=escrow_cid,
+                    buyer_eth=buyer_eth,
+                    seller_eth=seller_eth,
+                    price=price,
+                )
+            eth_bridge["dealId"] = "0x" + Web3.keccak(text=escrow_cid).hex()
         except Exception as e:
             eth_bridge = {"error": str(e)}
 
-    return (
-        jsonify(
-            {
-                "step": "escrow created",
-                "create_cash": r1,
-                "lock_cash": r2,
-                "escrow": r3,
-                "eth_bridge": eth_bridge,
-            }
-        ),
-        c3,
-    )
+    return 200, {
+        "step": "escrow created",
+        "fund_escrow": r1,
+        "escrow": escrow,
+        "eth_bridge": eth_bridge,
+    }
 
 
-@app.post("/buyer_confirm")
-def buyer_confirm():
-    buyer = (request.json or {}).get("buyer", "Alice-1")
-    c, d = query([tid("Escrow:Escrow")], read_as=buyer)
+@app.post("/create_deal")
+@traced("create_deal")
+def create_deal():
+    """Open one deal; body as in open_deal()."""
+    code, out = open_deal(request.json or {})
+    return jsonify(out), code
+
+
+_bulk_pool = ThreadPoolExecutor(
+    max_workers=BULK_DEAL_WORKERS, thread_name_prefix="bulk"
+)
+
+
+def _bulk_open(spec):
+    """open_deal() for one bulk item (a dict, or a raw NDJSON line)."""
+    try:
+        if isinstance(spec, (str, bytes)):
+            spec = json.loads(spec)
+        if not isinstance(spec, dict):
+            return 400, {"error": "deal spec must be a JSON object"}
+        with trace_flow("create_deal") as flow:
+            code, out = open_deal(spec)
+        if spec.get("timings"):
+            out["timings"] = flow_timings(flow)
+        return code, out
+    except (ValueError, TypeError) as e:
+        return 400, {"error": f"invalid deal spec: {e}"}
+    except Exception as e:
+        return 500, {"error": str(e)}
+
+
+def run_bulk(specs, fn, window: int):
+    """
+    Run fn(spec) on _bulk_pool with at most window items in flight, pulling
+    specs lazily. Yields (index, result) in completion order.
+    """
+    it = enumerate(specs)
+    pending: dict[Future, int] = {}
+    exhausted = False
+    while True:
+        while not exhausted and len(pending) < window:
+            nxt = next(it, None)
+            if nxt is None:
+                exhausted = True
+                break
+            pending[_bulk_pool.submit(fn, nxt[1])] = nxt[0]
+        if not pending:
+            return
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for fut in done:
+            yield pending.pop(fut), fut.result()
+
+
+@app.post("/deals/bulk")
+def deals_bulk():
+    """
+    Open many deals in one request.
+
+    body: a JSON array of open_deal() specs (or {"deals": [...]}), or an
+    NDJSON stream of them (Content-Type: application/x-ndjson).
+    Deals are opened BULK_DEAL_WORKERS at a time; Ethereum mirrors go
+    through the bridge job queue. The response is NDJSON, one line per deal
+    as it completes ({"index", "status", ...}), then a {"summary"} line.
+    """
+    if request.mimetype in ("application/x-ndjson", "application/jsonl"):
+        # read lazily, while results are already streaming back
+        specs = (line for line in request.stream if line.strip())
+    else:
+        body = request.get_json(silent=True)
+        if isinstance(body, dict):
+            body = body.get("deals")
+        if not isinstance(body, list):
+            return {"error": "expected a JSON array of deals or NDJSON"}, 400
+        specs = iter(body)
+
+    def gen():
+        ok = failed = 0
+        for index, (code, out) in run_bulk(specs, _bulk_open, 2 * BULK_DEAL_WORKERS):
+            if code == 200:
+                ok += 1
+            else:
+                failed += 1
+            yield json.dumps({"index": index, "status": code, **out}) + "\n"
+        yield json.dumps({"summary": {"ok": ok, "failed": failed}}) + "\n"
+
+    return Response(stream_with_context(gen()), mimetype="application/x-ndjson")
+
+
+def first_contract_id(template: str, party: str, field: str):
+    """
+    contractId of the first contract where payload[field] is party (legacy
+    behaviour when no explicit contract id is given). Returns (cid, error).
+    """
+    c, d = read_contracts(template, party, field=field, limit=1)
     if c != 200:
-        return jsonify(d), c
+        return None, (jsonify(d), c)
     items = d.get("result", [])
     if not items:
-        return {"error": "No Escrow contracts found for buyer"}, 404
-    cid = items[0]["contractId"]
+        entity = template.split(":", 1)[1]
+        return None, ({"error": f"No {entity} contracts found for {field}"}, 404)
+    return items[0]["contractId"], None
+
+
+@app.post("/buyer_confirm")
+def buyer_confirm():
+    """body: {"buyer": "Alice-1", "escrow_cid": "..."}; returns the Pending cid."""
+    body = request.json or {}
+    buyer = body.get("buyer", "Alice-1")
+    cid = body.get("escrow_cid")
+    if not cid:
+        cid, err = first_contract_id("Escrow:Escrow", buyer, "buyer")
+        if err:
+            return err
     c2, r2 = exercise(tid("Escrow:Escrow"), cid, buyer, "BuyerConfirm")
     return jsonify(r2), c2
 
 
 @app.post("/seller_confirm")
 def seller_confirm():
-    seller = (request.json or {}).get("seller", "Bob-1")
-    c, d = query([tid("Escrow:Pending")], read_as=seller)
-    if c != 200:
-        return jsonify(d), c
-    items = d.get("result", [])
-    if not items:
-        return {"error": "No Pending contracts found for seller"}, 404
-    cid = items[0]["contractId"]
+    """body: {"seller": "Bob-1", "pending_cid": "..."}; returns the Ready cid."""
+    body = request.json or {}
+    seller = body.get("seller", "Bob-1")
+    cid = body.get("pending_cid")
+    if not cid:
+        cid, err = first_contract_id("Escrow:Pending", seller, "seller")
+        if err:
+            return err
     c2, r2 = exercise(tid("Escrow:Pending"), cid, seller, "SellerConfirm")
     return jsonify(r2), c2
 
 
+def _settle_ready(choice: str, action: str):
+    body = request.json or {}
+    agent = body.get("agent", "Escrow-1")
+    cid = body.get("ready_cid")
+    if not cid:
+        cid, err = first_contract_id("Escrow:Ready", agent, "agent")
+        if err:
+            return err
+    c2, r2 = exercise(tid("Escrow:Ready"), cid, agent, choice)
+    if c2 == 200 and body.get("escrow_cid"):
+        r2 = dict(r2)
+        r2["eth_bridge"] = bridge_after_canton(body["escrow_cid"], action)
+    return jsonify(r2), c2
+
+
 @app.post("/release")
 def release():
-    agent = (request.json or {}).get("agent", "Escrow-1")
-    c, d = query([tid("Escrow:Ready")], read_as=agent)
-    if c != 200:
-        return jsonify(d), c
-    items = d.get("result", [])
-    if not items:
-        return {"error": "No Ready contracts found for agent"}, 404
-    cid = items[0]["contractId"]
-    c2, r2 = exercise(tid("Escrow:Ready"), cid, agent, "ReleaseToSeller")
-    return jsonify(r2), c2
+    """
+    body: {"agent": "Escrow-1", "ready_cid": "...", "escrow_cid": "..."}
+    With escrow_cid (the original Escrow contract mirrored on Ethereum), an
+    Ethereum release job is queued once the Canton release succeeds.
+    """
+    return _settle_ready("ReleaseToSeller", "release")
 
 
 @app.post("/refund")
 def refund():
-    agent = (request.json or {}).get("agent", "Escrow-1")
-    c, d = query([tid("Escrow:Ready")], read_as=agent)
-    if c != 200:
-        return jsonify(d), c
-    items = d.get("result", [])
-    if not items:
-        return {"error": "No Ready contracts found for agent"}, 404
-    cid = items[0]["contractId"]
-    c2, r2 = exercise(tid("Escrow:Ready"), cid, agent, "RefundToBuyer")
-    return jsonify(r2), c2
+    """
+    body: {"agent": "Escrow-1", "ready_cid": "...", "escrow_cid": "..."}
+    With escrow_cid (the original Escrow contract mirrored on Ethereum), an
+    Ethereum refund job is queued once the Canton refund succeeds.
+    """
+    return _settle_ready("RefundToBuyer", "refund")
 
 
 @app.post("/flow")
+@traced("flow")
 def flow():
     """
     Convenience endpoint that executes the full Escrow flow
-    (BuyerConfirm -> SellerConfirm -> ReleaseToSeller)
-    for the first matching contracts it finds.
-    """
-    out = {}
-
-    c1, d1 = query([tid("Escrow:Escrow")], read_as="Alice-1")
-    out["escrow_query"] = d1
-    if c1 == 200 and d1.get("result"):
-        cid = d1["result"][0]["contractId"]
-        c1x, d1x = exercise(tid("Escrow:Escrow"), cid, "Alice-1", "BuyerConfirm")
-        out["buyer_confirm"] = d1x
-
-    c2, d2 = query([tid("Escrow:Pending")], read_as="Bob-1")
-    out["pending_query"] = d2
-    if c2 == 200 and d2.get("result"):
-        cid = d2["result"][0]["contractId"]
-        c2x, d2x = exercise(tid("Escrow:Pending"), cid, "Bob-1", "SellerConfirm")
-        out["seller_confirm"] = d2x
-
-    c3, d3 = query([tid("Escrow:Ready")], read_as="Escrow-1")
-    out["ready_query"] = d3
-    if c3 == 200 and d3.get("result"):
-        cid = d3["result"][0]["contractId"]
-        c3x, d3x = exercise(tid("Escrow:Ready"), cid, "Escrow-1", "ReleaseToSeller")
-        out["release"] = d3x
+    (BuyerConfirm -> SellerConfirm -> ReleaseToSeller) for one deal,
+    following the contract ids returned by each step.
+    body: {"escrow_cid": "..."}  (default: the first Escrow of Alice-1)
+    """
+    body = request.json or {}
 
-    return jsonify(out), 200
+    cid = body.get("escrow_cid")
+    if not cid:
+        cid, err = first_contract_id("Escrow:Escrow", "Alice-1", "buyer")
+        if err:
+            return err
+
+    code, steps = run_escrow_settlement(cid)
+    if not steps:
+        return {"error": "Escrow not found", "escrow_cid": cid}, 404
+    return jsonify({"escrow_cid": cid, **steps}), code
 
 
 @app.get("/deals/<party>")
@@ -1390,54 +3764,99 @@ def deals_for_party(party):
     Return a unified list of deals for a given party,
     including the current status (Escrow / Pending / Ready)
     and the party's role (buyer / seller / agent).
+    query args: role=buyer|seller|agent (only deals where the party has that
+    role), plus limit / cursor / format / stream (see paged_response).
     """
     party_id = get_party_id(party)
+    role_filter = request.args.get("role")
+    if role_filter and role_filter not in DEAL_ROLES:
+        return {"error": f"role must be one of {', '.join(DEAL_ROLES)}"}, 400
+    cursor = request.args.get("cursor")
+
+    def read(template):
+        if role_filter:
+            return iter_contracts(
+                template,
+                party,
+                field=role_filter,
+                read_as="Escrow-1",
+                cursor=cursor,
+                timeout=DEALS_QUERY_BUDGET,
+            )
+        return iter_contracts(
+            template, party, cursor=cursor, timeout=DEALS_QUERY_BUDGET
+        )
 
-    esc_code, esc_data = query([tid("Escrow:Escrow")], read_as="Escrow-1")
-    pend_code, pend_data = query([tid("Escrow:Pending")], read_as="Escrow-1")
-    ready_code, ready_data = query([tid("Escrow:Ready")], read_as="Escrow-1")
-
-    for code, data in [
-        (esc_code, esc_data),
-        (pend_code, pend_data),
-        (ready_code, ready_data),
-    ]:
+    # Query the three states concurrently within one time budget; a state
+    # that fails or times out is reported instead of failing the whole call.
+    statuses = {
+        "Escrow": "Escrow:Escrow",
+        "Pending": "Escrow:Pending",
+        "Ready": "Escrow:Ready",
+    }
+    futures = {st: _ledger_pool.submit(read, t) for st, t in statuses.items()}
+    wait(futures.values(), timeout=DEALS_QUERY_BUDGET)
+
+    results = {}
+    failed = []
+    stale = False
+    for st, fut in futures.items():
+        if not fut.done():
+            fut.cancel()
+            failed.append({"status": st, "error": "timeout"})
+            continue
+        try:
+            code, rows, st_stale = fut.result()
+        except Exception as e:
+            failed.append({"status": st, "error": str(e)})
+            continue
         if code not in (200, 404):
-            return jsonify({"error": "ledger query failed", "details": data}), code
+            failed.append({"status": st, "code": code, "details": rows})
+            continue
+        results[st] = rows if code == 200 else iter(())
+        stale = stale or st_stale
+
+    if not results:
+        return jsonify({"error": "ledger query failed", "details": failed}), 502
 
-    def mk_list(data, status):
-        deals = []
-        for c in data.get("result", []):
+    def mk_deals(rows, status):
+        for c in rows:
             pld = c["payload"]
-            role = None
-            if pld.get("buyer") == party_id:
-                role = "buyer"
-            elif pld.get("seller") == party_id:
-                role = "seller"
-            elif pld.get("agent") == party_id:
-                role = "agent"
+            role = role_filter
+            if role is None:
+                if pld.get("buyer") == party_id:
+                    role = "buyer"
+                elif pld.get("seller") == party_id:
+                    role = "seller"
+                elif pld.get("agent") == party_id:
+                    role = "agent"
             if role is None:
                 continue
-            deals.append(
-                {
-                    "contractId": c["contractId"],
-                    "status": status,
-                    "role": role,
-                    "item": pld.get("item"),
-                    "price": pld.get("price"),
-                    "buyer": pld.get("buyer"),
-                    "seller": pld.get("seller"),
-                    "agent": pld.get("agent"),
-                }
-            )
-        return deals
+            yield {
+                "contractId": c["contractId"],
+                "status": status,
+                "role": role,
+                "item": pld.get("item"),
+                "price": pld.get("price"),
+                "buyer": pld.get("buyer"),
+                "seller": pld.get("seller"),
+                "agent": pld.get("agent"),
+            }
 
-    all_deals = []
-    all_deals += mk_list(esc_data, "Escrow")
-    all_deals += mk_list(pend_data, "Pending")
-    all_deals += mk_list(ready_data, "Ready")
+    # Each state is already in contractId order; merge lazily so a page only
+    # touches the contracts it returns.
+    all_deals = heapq.merge(
+        *(mk_deals(rows, st) for st, rows in results.items()),
+        key=lambda d: d["contractId"],
+    )
 
-    return jsonify({"party": party, "partyId": party_id, "deals": all_deals}), 200
+    envelope = {"party": party, "partyId": party_id}
+    if failed:
+        envelope["partial"] = True
+        envelope["failed"] = failed
+    if stale:
+        envelope["stale"] = True
+    return paged_response(all_deals, envelope, key="deals")
 
 
 @app.get("/")
@@ -1445,16 +3864,31 @@ def index():
     return render_template("index.html")
 
 
+# Resolve the packageId once per process (i.e. per gunicorn worker) at import
+# time, so the first request never waits for DAR inspection or `daml build`.
+try:
+    init_package_id()
+except Exception as e:
+    print("[i] packageId not resolved at startup:", e)
+
+# Same for the party directory: one blocking load, then background refreshes
+print("[i] Refreshing Canton party map from ledger...")
+ensure_party_cache()
+
+
 if __name__ == "__main__":
     print(f"[i] JSON API: {API_URL}")
     print(f"[i] Project root: {find_project_root()}")
-    print("[i] Refreshing Canton party map from ledger...")
-    refresh_party_cache_from_ledger()
-    print("[i] Party cache loaded.")
+    start_party_refresher()
+    start_alias_index()
+    start_acs_store()
+    start_bridge_workers()
+    start_eth_meta_refresher()
 
     # Start Ethereum deposit watcher if Web3 is available
     if w3 and w3.is_connected():
         print("[eth] Web3 connected, starting deposit watcher...")
+        start_settlement_executor()
         start_eth_deposit_watcher()
     else:
         print("[eth] Web3 NOT connected, watcher will not start.")
@@ -0,0 +1,97 @@
+# pragma version ~=0.4.0
+"""
+@title StablecoinEscrow
+@notice Local equivalent of the Sepolia StablecoinEscrow used by the bridge
+        (same functions, events and deals() layout as ESCROW_ABI in app.py).
+        The broker opens and settles deals; the buyer deposits the tokens.
+"""
+
+from ethereum.ercs import IERC20
+
+event DealCreated:
+    dealId: indexed(bytes32)
+    buyer: indexed(address)
+    seller: indexed(address)
+    amount: uint256
+
+event Deposited:
+    dealId: indexed(bytes32)
+    buyer: indexed(address)
+    amount: uint256
+
+event Released:
+    dealId: indexed(bytes32)
+    seller: indexed(address)
+    amount: uint256
+
+event Refunded:
+    dealId: indexed(bytes32)
+    buyer: indexed(address)
+    amount: uint256
+
+struct Deal:
+    buyer: address
+    seller: address
+    amount: uint256
+    deposited: bool
+    releasedOrRefunded: bool
+
+token: public(IERC20)
+broker: public(address)
+_deals: HashMap[bytes32, Deal]
+
+
+@deploy
+def __init__(token: address, broker: address):
+    self.token = IERC20(token)
+    self.broker = broker
+
+
+@external
+def createDeal(dealId: bytes32, buyer: address, seller: address, amount: uint256):
+    assert msg.sender == self.broker, "only broker"
+    assert self._deals[dealId].buyer == empty(address), "deal exists"
+    assert buyer != empty(address) and seller != empty(address), "bad party"
+    assert amount > 0, "zero amount"
+    self._deals[dealId] = Deal(
+        buyer=buyer, seller=seller, amount=amount, deposited=False, releasedOrRefunded=False
+    )
+    log DealCreated(dealId=dealId, buyer=buyer, seller=seller, amount=amount)
+
+
+@external
+def deposit(dealId: bytes32):
+    d: Deal = self._deals[dealId]
+    assert d.buyer != empty(address), "no deal"
+    assert msg.sender == d.buyer, "only buyer"
+    assert not d.deposited, "already deposited"
+    self._deals[dealId].deposited = True
+    assert extcall self.token.transferFrom(msg.sender, self, d.amount), "transfer failed"
+    log Deposited(dealId=dealId, buyer=msg.sender, amount=d.amount)
+
+
+@external
+def release(dealId: bytes32):
+    assert msg.sender == self.broker, "only broker"
+    d: Deal = self._deals[dealId]
+    assert d.deposited and not d.releasedOrRefunded, "not releasable"
+    self._deals[dealId].releasedOrRefunded = True
+    assert extcall self.token.transfer(d.seller, d.amount), "transfer failed"
+    log Released(dealId=dealId, seller=d.seller, amount=d.amount)
+
+
+@external
+def refund(dealId: bytes32):
+    assert msg.sender == self.broker, "only broker"
+    d: Deal = self._deals[dealId]
+    assert d.deposited and not d.releasedOrRefunded, "not refundable"
+    self._deals[dealId].releasedOrRefunded = True
+    assert extcall self.token.transfer(d.buyer, d.amount), "transfer failed"
+    log Refunded(dealId=dealId, buyer=d.buyer, amount=d.amount)
+
+
+@view
+@external
+def deals(dealId: bytes32) -> (address, address, uint256, bool, bool):
+    d: Deal = self._deals[dealId]
+    return d.buyer, d.seller, d.amount, d.deposited, d.releasedOrRefunded
@@ -0,0 +1,293 @@
+"""
+Local Ethereum chain for the bridge: deploys MockUSDT + StablecoinEscrow
+(server/contracts/*.vy) and prints the environment app.py needs, so
+send_tx, the bridge jobs and the deposit watcher run without Sepolia.
+
+Backends:
+  eth-tester (default)  in-memory py-evm chain served over JSON-RPC by
+                        this process
+  anvil                 a Foundry dev node, started as a subprocess
+
+Blocks are mined every --block-time seconds (0 = one block per transaction),
+so bridge throughput, nonce handling and watcher catch-up can be measured
+offline and reproducibly. Contracts are compiled with vyper.
+
+Run:
+  pip install -r server/requirements-dev.txt  # eth-tester[py-evm], vyper
+  python server/local_eth.py --block-time 2 > .env.local-eth
+  set -a; . ./.env.local-eth; set +a; python server/app.py
+"""
+
+import argparse
+import atexit
+import logging
+import os
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from collections.abc import Mapping
+from pathlib import Path
+
+from web3 import Web3
+
+CONTRACTS_DIR = Path(__file__).resolve().parent / "contracts"
+
+# Well-known dev keys (anvil accounts #0 and #1): broker and demo buyer
+BROKER_KEY = "0xac0974bec39a17e36ba4a6b4d238ff944bacb478cbed5efcae784d7bf4f2ff80"
+BUYER_KEY = "0x59c6995e998f97a5a0044966f0945389dc9e86dae88c7a8412f4603b6b78690d"
+
+# Demo buyer starts with this many mUSDT (6 decimals), pre-approved for escrow
+BUYER_TOKENS = 1_000_000 * 10**6
+
+
+def log(*args):
+    # stdout carries only the env lines, so it can be sourced
+    print(*args, file=sys.stderr, flush=True)
+
+
+def compile_contract(name: str) -> dict:
+    """abi + bytecode of server/contracts/<name>.vy."""
+    import vyper
+
+    src = (CONTRACTS_DIR / f"{name}.vy").read_text()
+    out = vyper.compile_code(src, output_formats=["abi", "bytecode"])
+    return {"abi": out["abi"], "bytecode": out["bytecode"]}
+
+
+# =====================================
+# Backends
+# =====================================
+
+
+def to_rpc(value):
+    """web3 result values -> JSON-RPC encoding (hex quantities and data)."""
+    if isinstance(value, bool) or value is None or isinstance(value, str):
+        return value
+    if isinstance(value, int):
+        return hex(value)
+    if isinstance(value, (bytes, bytearray)):
+        return "0x" + bytes(value).hex()
+    if isinstance(value, Mapping):
+        return {k: to_rpc(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_rpc(v) for v in value]
+    return value
+
+
+def serve_eth_tester(host: str, port: int, block_time: float) -> str:
+    """
+    Start an in-memory py-evm chain behind a JSON-RPC endpoint in daemon
+    threads; returns its URL.
+    """
+    from eth_tester import EthereumTester, PyEVMBackend
+    from flask import Flask, request, jsonify
+    from web3 import EthereumTesterProvider
+    from werkzeug.serving import make_server
+
+    tester = EthereumTester(PyEVMBackend())
+    provider = EthereumTesterProvider(tester)
+    lock = threading.Lock()
+
+    # Fund the dev accounts from the tester's own unlocked account
+    w3 = Web3(provider)
+    for key in (BROKER_KEY, BUYER_KEY):
+        acct = w3.eth.account.from_key(key)
+        tester.add_account(key)
+        w3.eth.send_transaction(
+            {"from": w3.eth.accounts[0], "to": acct.address, "value": 10**21}
+        )
+
+    # eth-tester's own pending pool rejects EIP-155 legacy signatures, so with
+    # a block time raw transactions wait here and are mined at the next tick.
+    queued: list[tuple[str, str]] = []  # (sender, raw tx)
+
+    def miner():
+        while True:
+            time.sleep(block_time)
+            with lock:
+                batch = queued[:]
+                queued.clear()
+                for _, raw in batch:
+                    try:
+                        tester.send_raw_transaction(raw)
+                    except Exception as e:
+                        log(f"[local-eth] dropped queued transaction: {e}")
+                if not batch:
+                    tester.mine_blocks(1)
+
+    if block_time > 0:
+        threading.Thread(target=miner, daemon=True).start()
+
+    # The provider's own middleware maps raw JSON-RPC params onto eth-tester
+    # and its results back to web3 types; to_rpc re-encodes those as JSON.
+    request_func = provider.request_func(w3, w3.middleware_onion)
+    rpc = Flask("local_eth")
+
+    def queue_raw(params: list) -> dict:
+        raw = params[0]
+        sender = w3.eth.account.recover_transaction(raw)
+        queued.append((sender, raw))
+        return {"result": Web3.keccak(hexstr=raw)}
+
+    def pending_nonce(params: list) -> dict:
+        resp = request_func("eth_getTransactionCount", [params[0], "latest"])
+        sender = Web3.to_checksum_address(params[0])
+        n = sum(1 for s, _ in queued if s == sender)
+        return {"result": resp["result"] + n}
+
+    def handle(call: dict) -> dict:
+        method, params = call["method"], call.get("params", [])
+        try:
+            with lock:
+                if block_time > 0 and method == "eth_sendRawTransaction":
+                    resp = queue_raw(params)
+                elif (
+                    block_time > 0
+                    and method == "eth_getTransactionCount"
+                    and params[1:] == ["pending"]
+                ):
+                    resp = pending_nonce(params)
+                else:
+                    resp = request_func(method, params)
+        except Exception as e:
+            resp = {"error": {"code": -32000, "message": str(e)}}
+        return {"jsonrpc": "2.0", "id": call.get("id"), **to_rpc(dict(resp))}
+
+    @rpc.post("/")
+    def jsonrpc():
+        body = request.get_json(force=True)
+        if isinstance(body, list):
+            return jsonify([handle(c) for c in body])
+        return jsonify(handle(body))
+
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+    server = make_server(host, port, rpc, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://{host}:{port}"
+
+
+def start_anvil(host: str, port: int, block_time: float, chain_id: int) -> str:
+    """Start anvil (its accounts #0/#1 are BROKER_KEY/BUYER_KEY); returns its URL."""
+    anvil = shutil.which("anvil")
+    if not anvil:
+        raise RuntimeError("anvil not found on PATH (install Foundry)")
+    cmd = [anvil, "--host", host, "--port", str(port), "--chain-id", str(chain_id)]
+    if block_time > 0:
+        cmd += ["--block-time", str(block_time)]
+    proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT)
+    atexit.register(proc.terminate)
+    url = f"http://{host}:{port}"
+    w3 = Web3(Web3.HTTPProvider(url))
+    for _ in range(100):
+        if proc.poll() is not None:
+            raise RuntimeError(f"anvil exited with {proc.returncode}")
+        if w3.is_connected():
+            return url
+        time.sleep(0.1)
+    raise RuntimeError("anvil did not start")
+
+
+# =====================================
+# Deployment
+# =====================================
+
+
+def transact(w3: Web3, acct, fn):
+    """Sign and send with acct, wait for the receipt (asserts success)."""
+    # legacy gasPrice, like send_tx in app.py
+    tx = fn.build_transaction(
+        {
+            "from": acct.address,
+            "nonce": w3.eth.get_transaction_count(acct.address, "pending"),
+            "chainId": w3.eth.chain_id,
+            "gasPrice": w3.eth.gas_price,
+        }
+    )
+    signed = acct.sign_transaction(tx)
+    tx_hash = w3.eth.send_raw_transaction(signed.raw_transaction)
+    receipt = w3.eth.wait_for_transaction_receipt(tx_hash, timeout=120)
+    if receipt.status != 1:
+        raise RuntimeError(f"transaction {tx_hash.hex()} failed")
+    return receipt
+
+
+def deploy(w3: Web3) -> dict:
+    """Deploy MockUSDT + StablecoinEscrow and fund/approve the demo buyer."""
+    broker = w3.eth.account.from_key(BROKER_KEY)
+    buyer = w3.eth.account.from_key(BUYER_KEY)
+
+    usdt = compile_contract("MockUSDT")
+    escrow = compile_contract("StablecoinEscrow")
+
+    factory = w3.eth.contract(abi=usdt["abi"], bytecode=usdt["bytecode"])
+    token_addr = transact(w3, broker, factory.constructor()).contractAddress
+
+    factory = w3.eth.contract(abi=escrow["abi"], bytecode=escrow["bytecode"])
+    escrow_addr = transact(
+        w3, broker, factory.constructor(token_addr, broker.address)
+    ).contractAddress
+
+    token = w3.eth.contract(address=token_addr, abi=usdt["abi"])
+    transact(w3, broker, token.functions.mint(buyer.address, BUYER_TOKENS))
+    transact(w3, buyer, token.functions.approve(escrow_addr, 2**256 - 1))
+
+    return {
+        "token": token_addr,
+        "escrow": escrow_addr,
+        "broker": broker.address,
+        "buyer": buyer.address,
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Local chain for the Ethereum bridge")
+    ap.add_argument("--backend", choices=("eth-tester", "anvil"), default="eth-tester")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8545)
+    ap.add_argument(
+        "--block-time",
+        type=float,
+        default=float(os.environ.get("ETH_BLOCK_TIME", "1")),
+        help="seconds between blocks (0 = mine every transaction)",
+    )
+    ap.add_argument(
+        "--chain-id", type=int, default=31337, help="anvil only (eth-tester is fixed)"
+    )
+    args = ap.parse_args()
+
+    if args.backend == "anvil":
+        url = start_anvil(args.host, args.port, args.block_time, args.chain_id)
+    else:
+        url = serve_eth_tester(args.host, args.port, args.block_time)
+
+    w3 = Web3(Web3.HTTPProvider(url))
+    log(f"[local-eth] {args.backend} on {url}, block time {args.block_time}s")
+    addrs = deploy(w3)
+    log(f"[local-eth] MockUSDT {addrs['token']}, StablecoinEscrow {addrs['escrow']}")
+    log(f"[local-eth] demo buyer {addrs['buyer']} (key {BUYER_KEY})")
+
+    env = {
+        "ETH_RPC_URL": url,
+        "ETH_CHAIN_ID": w3.eth.chain_id,
+        "SEPOLIA_ESCROW_ADDRESS": addrs["escrow"],
+        "SEPOLIA_TOKEN_ADDRESS": addrs["token"],
+        "ETH_BROKER_PRIVATE_KEY": BROKER_KEY,
+        "ETH_WATCH_START_BLOCK": 0,
+        "ETH_CONFIRMATIONS": 0,
+        "ETH_RECEIPT_POLL": max(args.block_time / 2, 0.2),
+    }
+    for k, v in env.items():
+        print(f"{k}={v}", flush=True)
+
+    log("[local-eth] running, Ctrl-C to stop")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,511 @@
+"""
+Stand-in for the Canton JSON API, for running app.py without a participant
+(CI, laptops, benchmarks).
+
+Implements /v1/query, /v1/create, /v1/exercise, /v1/create-and-exercise,
+/v1/fetch, /v1/parties and /readyz over an in-memory contract store, and
+models the choices of the Token, Escrow and Parties templates (including
+Offer and EscrowFunding). There is no /v1/stream/query: the app's local
+contract store and alias index stay offline and reads go to /v1/query.
+
+Run:
+  python server/mock_ledger.py --port 7576 --latency-ms 20 --error-rate 0.01
+  DAML_API_URL=http://localhost:7576/v1 DAML_PACKAGE_ID=mock python server/app.py
+
+Tokens are decoded but not verified; actAs / readAs are enforced the way the
+ledger would (controllers must act, stakeholders can see).
+"""
+
+import argparse
+import base64
+import json
+import os
+import random
+import threading
+import time
+import uuid
+from decimal import Decimal
+
+from flask import Flask, request, jsonify
+
+# Injected latency (per request, in milliseconds) and failure ratio (0..1)
+MOCK_LATENCY_MS = float(os.environ.get("MOCK_LATENCY_MS", "0"))
+MOCK_JITTER_MS = float(os.environ.get("MOCK_JITTER_MS", "0"))
+MOCK_ERROR_RATE = float(os.environ.get("MOCK_ERROR_RATE", "0"))
+
+# Parties allocated at startup, as "<hint>::<namespace>"
+MOCK_PARTIES = os.environ.get("MOCK_PARTIES", "Alice-1,Bob-1,Bank-1,Escrow-1")
+MOCK_NAMESPACE = os.environ.get("MOCK_NAMESPACE", "1220" + "0" * 60)
+
+app = Flask(__name__)
+
+_contracts: dict[str, dict] = {}  # contractId -> contract (active only)
+_lock = threading.Lock()
+_offset = 0
+
+_parties: dict[str, str] = {}  # hint -> full Party id
+
+
+class LedgerError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+# =====================================
+# Template model
+# =====================================
+
+# 'Module:Entity' -> signatory / observer fields, Decimal fields, choices.
+# A choice is (controller fields, body); bodies run inside a transaction
+# (see Tx) as body(tx, payload, argument) and return the exerciseResult.
+TEMPLATES: dict[str, dict] = {}
+
+
+def template(name, choices, signatories, observers=(), decimals=()):
+    TEMPLATES[name] = {
+        "signatories": signatories,
+        "observers": observers,
+        "decimals": decimals,
+        "choices": choices,
+    }
+
+
+def no_op(tx, pld, arg):
+    return {}
+
+
+def transfer(tx, cash_cid, new_owner):
+    return tx.exercise(cash_cid, "Transfer", {"newOwner": new_owner})
+
+
+def fund_escrow(tx, agent, bank, buyer, seller, item, price):
+    cash = tx.create(
+        "Token:Cash",
+        {"issuer": bank, "owner": buyer, "currency": "USD", "amount": price},
+    )
+    locked = transfer(tx, cash, agent)
+    return tx.create(
+        "Escrow:Escrow",
+        {
+            "agent": agent,
+            "buyer": buyer,
+            "seller": seller,
+            "item": item,
+            "price": price,
+            "locked": locked,
+        },
+    )
+
+
+def next_state(template_name):
+    """Choice body moving an escrow to the next state template."""
+
+    def run(tx, pld, arg):
+        return tx.create(template_name, {**pld})
+
+    return run
+
+
+def pay_out(field):
+    """Choice body transferring the locked Cash to payload[field]."""
+
+    def run(tx, pld, arg):
+        transfer(tx, pld["locked"], pld[field])
+        return {}
+
+    return run
+
+
+def split(tx, pld, arg):
+    left = Decimal(str(arg["left"]))
+    amount = Decimal(pld["amount"])
+    if not 0 < left < amount:
+        raise LedgerError(400, "left must be > 0 and < amount")
+    return {
+        "_1": tx.create("Token:Cash", {**pld, "amount": left}),
+        "_2": tx.create("Token:Cash", {**pld, "amount": amount - left}),
+    }
+
+
+def complete(tx, pld, arg):
+    transfer(tx, pld["locked"], pld["seller"])
+    fields = ("agent", "buyer", "seller", "item", "price")
+    return tx.create("Escrow:Completed", {k: pld[k] for k in fields})
+
+
+ESCROW_PARTIES = dict(signatories=("agent",), observers=("buyer", "seller"))
+
+template(
+    "Token:Cash",
+    {
+        "Transfer": (
+            ("owner",),
+            lambda tx, pld, arg: tx.create(
+                "Token:Cash", {**pld, "owner": arg["newOwner"]}
+            ),
+        ),
+        "Split": (("owner",), split),
+    },
+    signatories=("issuer",),
+    observers=("owner",),
+    decimals=("amount",),
+)
+template(
+    "Escrow:Escrow",
+    {
+        "BuyerConfirm": (("buyer",), next_state("Escrow:Pending")),
+        "Cancel": (("agent",), pay_out("buyer")),
+    },
+    decimals=("price",),
+    **ESCROW_PARTIES,
+)
+template(
+    "Escrow:Pending",
+    {
+        "SellerConfirm": (("seller",), next_state("Escrow:Ready")),
+        "RequestRefund": (("agent",), pay_out("buyer")),
+    },
+    decimals=("price",),
+    **ESCROW_PARTIES,
+)
+template(
+    "Escrow:Ready",
+    {
+        "ConfirmDeal": (("agent",), complete),
+        "ReleaseToSeller": (("agent",), pay_out("seller")),
+        "RefundToBuyer": (("agent",), pay_out("buyer")),
+    },
+    decimals=("price",),
+    **ESCROW_PARTIES,
+)
+template("Escrow:Completed", {}, decimals=("price",), **ESCROW_PARTIES)
+template(
+    "Escrow:Offer",
+    {
+        "Accept": (("seller",), no_op),
+        "Reject": (("seller",), no_op),
+        "AcceptAndFund": (
+            ("agent", "bank", "buyer"),
+            lambda tx, pld, arg: fund_escrow(
+                tx,
+                pld["agent"],
+                arg["bank"],
+                pld["buyer"],
+                pld["seller"],
+                arg["item"],
+                pld["totalPrice"],
+            ),
+        ),
+    },
+    decimals=("ccAmount", "unitPrice", "totalPrice"),
+    **ESCROW_PARTIES,
+)
+template(
+    "Escrow:EscrowFunding",
+    {
+        "Fund": (
+            ("bank", "buyer"),
+            lambda tx, pld, arg: fund_escrow(
+                tx,
+                pld["agent"],
+                pld["bank"],
+                pld["buyer"],
+                pld["seller"],
+                pld["item"],
+                pld["price"],
+            ),
+        ),
+    },
+    signatories=("agent",),
+    observers=("bank", "buyer", "seller"),
+    decimals=("price",),
+)
+template("Parties:PartyAlias", {}, signatories=("admin",))
+
+
+def entity(template_id: str) -> str:
+    """'<pkg>:Module:Entity' -> 'Module:Entity'."""
+    return template_id.split(":", 1)[1] if template_id.count(":") >= 2 else template_id
+
+
+def stakeholders(contract: dict) -> set:
+    t = TEMPLATES[entity(contract["templateId"])]
+    pld = contract["payload"]
+    return {pld[f] for f in t["signatories"] + t["observers"]}
+
+
+# =====================================
+# Transactions
+# =====================================
+
+
+class Tx:
+    """
+    One ledger transaction: creates and archives are staged and only
+    applied on commit, so a failing choice leaves the store untouched.
+    Nested actions are authorized by the submitters plus the signatories
+    and controllers of the enclosing choices, as on the ledger.
+    """
+
+    def __init__(self, act_as: set, pkg: str):
+        self.authorizers = set(act_as)
+        self.pkg = pkg
+        self.created: dict[str, dict] = {}
+        self.archived: list[dict] = []
+        self.events: list[dict] = []
+
+    def _tid(self, name: str) -> str:
+        return f"{self.pkg}:{name}" if self.pkg else name
+
+    def lookup(self, cid: str) -> dict:
+        contract = self.created.get(cid) or _contracts.get(cid)
+        if contract is None or any(a["contractId"] == cid for a in self.archived):
+            raise LedgerError(
+                404, f"CONTRACT_NOT_ACTIVE: contract {cid} not found or archived"
+            )
+        return contract
+
+    def create(self, name: str, payload: dict) -> str:
+        t = TEMPLATES.get(name)
+        if t is None:
+            raise LedgerError(400, f"unknown template {name}")
+        payload = dict(payload)
+        for f in t["decimals"]:
+            if f in payload:
+                payload[f] = str(Decimal(str(payload[f])))
+        missing = [
+            p for p in t["signatories"] if payload.get(p) not in self.authorizers
+        ]
+        if missing:
+            raise LedgerError(
+                400, f"DAML_AUTHORIZATION_ERROR: create {name} needs {missing}"
+            )
+        cid = "00" + uuid.uuid4().hex
+        contract = {
+            "contractId": cid,
+            "templateId": self._tid(name),
+            "payload": payload,
+            "signatories": [payload[f] for f in t["signatories"]],
+            "observers": [payload[f] for f in t["observers"]],
+            "agreementText": "",
+        }
+        self.created[cid] = contract
+        self.events.append({"created": contract})
+        return cid
+
+    def consume(self, cid: str, name: str | None = None) -> dict:
+        contract = self.lookup(cid)
+        if name and entity(contract["templateId"]) != name:
+            raise LedgerError(400, f"contract {cid} is not a {name}")
+        self.archived.append(contract)
+        self.events.append(
+            {
+                "archived": {
+                    "contractId": cid,
+                    "templateId": contract["templateId"],
+                }
+            }
+        )
+        return contract
+
+    def exercise(self, cid: str, choice: str, argument: dict):
+        contract = self.lookup(cid)
+        name = entity(contract["templateId"])
+        t = TEMPLATES[name]
+        pld = contract["payload"]
+
+        if choice == "Archive":
+            controllers = [pld[f] for f in t["signatories"]]
+            body = no_op
+        elif choice in t["choices"]:
+            fields, body = t["choices"][choice]
+            # Controllers may come from the payload or from the choice argument
+            controllers = [pld.get(f) or argument.get(f) for f in fields]
+        else:
+            raise LedgerError(400, f"unknown choice {choice} on {name}")
+
+        missing = [p for p in controllers if p not in self.authorizers]
+        if missing:
+            raise LedgerError(
+                400, f"DAML_AUTHORIZATION_ERROR: {choice} needs {missing}"
+            )
+
+        outer = self.authorizers
+        self.authorizers = outer | set(contract["signatories"]) | set(controllers)
+        try:
+            self.consume(cid)
+            return body(self, pld, argument)
+        finally:
+            self.authorizers = outer
+
+    def commit(self):
+        global _offset
+        for c in self.archived:
+            _contracts.pop(c["contractId"], None)
+            self.created.pop(c["contractId"], None)
+        _contracts.update(self.created)
+        _offset += 1
+
+
+# =====================================
+# HTTP layer
+# =====================================
+
+
+def claims() -> tuple[set, set]:
+    """(actAs, readAs) of the bearer token; the signature is not checked."""
+    auth = request.headers.get("Authorization", "")
+    try:
+        body = auth.removeprefix("Bearer ").split(".")[1]
+        body += "=" * (-len(body) % 4)
+        la = json.loads(base64.urlsafe_b64decode(body))["https://daml.com/ledger-api"]
+    except Exception:
+        raise LedgerError(401, "missing or malformed token")
+    act_as = set(la.get("actAs", []))
+    return act_as, act_as | set(la.get("readAs", []))
+
+
+def submitters() -> set:
+    """actAs of a command; every submitter must be an allocated party."""
+    act_as, _ = claims()
+    unknown = act_as - set(_parties.values())
+    if unknown:
+        raise LedgerError(400, f"PARTY_NOT_KNOWN_ON_LEDGER: {sorted(unknown)}")
+    return act_as
+
+
+def package_of(template_id: str) -> str:
+    return template_id.split(":", 1)[0] if template_id.count(":") >= 2 else ""
+
+
+def ok(result, status: int = 200):
+    return jsonify({"status": status, "result": result}), status
+
+
+@app.errorhandler(LedgerError)
+def ledger_error(e: LedgerError):
+    return jsonify({"status": e.status, "errors": [str(e)]}), e.status
+
+
+@app.before_request
+def inject_latency_and_errors():
+    if request.path == "/readyz":
+        return None
+    delay = MOCK_LATENCY_MS + random.uniform(-1, 1) * MOCK_JITTER_MS
+    if delay > 0:
+        time.sleep(delay / 1000)
+    if MOCK_ERROR_RATE and random.random() < MOCK_ERROR_RATE:
+        return jsonify({"status": 503, "errors": ["injected failure"]}), 503
+    return None
+
+
+@app.get("/readyz")
+def readyz():
+    return "ok", 200
+
+
+@app.get("/v1/parties")
+def parties():
+    claims()
+    return ok(
+        [
+            {"identifier": pid, "displayName": hint, "isLocal": True}
+            for hint, pid in _parties.items()
+        ]
+    )
+
+
+@app.post("/v1/query")
+def query():
+    _, read_as = claims()
+    body = request.json or {}
+    wanted = {entity(t) for t in body.get("templateIds", [])}
+    flt = body.get("query") or {}
+    with _lock:
+        result = [
+            c
+            for c in _contracts.values()
+            if entity(c["templateId"]) in wanted
+            and stakeholders(c) & read_as
+            and all(c["payload"].get(k) == v for k, v in flt.items())
+        ]
+    return ok(result)
+
+
+@app.post("/v1/fetch")
+def fetch():
+    _, read_as = claims()
+    body = request.json or {}
+    with _lock:
+        c = _contracts.get(body.get("contractId"))
+    if c is None or not stakeholders(c) & read_as:
+        return ok(None)
+    return ok(c)
+
+
+@app.post("/v1/create")
+def create():
+    act_as = submitters()
+    body = request.json or {}
+    with _lock:
+        tx = Tx(act_as, package_of(body["templateId"]))
+        cid = tx.create(entity(body["templateId"]), body.get("payload", {}))
+        tx.commit()
+    return ok(tx.created[cid])
+
+
+@app.post("/v1/exercise")
+def exercise():
+    act_as = submitters()
+    body = request.json or {}
+    with _lock:
+        tx = Tx(act_as, package_of(body["templateId"]))
+        result = tx.exercise(
+            body["contractId"], body["choice"], body.get("argument") or {}
+        )
+        tx.commit()
+    return ok({"exerciseResult": result, "events": tx.events})
+
+
+@app.post("/v1/create-and-exercise")
+def create_and_exercise():
+    act_as = submitters()
+    body = request.json or {}
+    with _lock:
+        tx = Tx(act_as, package_of(body["templateId"]))
+        cid = tx.create(entity(body["templateId"]), body.get("payload", {}))
+        result = tx.exercise(cid, body["choice"], body.get("argument") or {})
+        tx.commit()
+    return ok({"exerciseResult": result, "events": tx.events})
+
+
+def allocate_parties(hints):
+    for hint in hints:
+        if hint:
+            _parties[hint] = f"{hint}::{MOCK_NAMESPACE}"
+
+
+allocate_parties(MOCK_PARTIES.split(","))
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Mock Canton JSON API")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=7576)
+    ap.add_argument("--latency-ms", type=float, default=MOCK_LATENCY_MS)
+    ap.add_argument("--jitter-ms", type=float, default=MOCK_JITTER_MS)
+    ap.add_argument("--error-rate", type=float, default=MOCK_ERROR_RATE)
+    args = ap.parse_args()
+
+    MOCK_LATENCY_MS = args.latency_ms
+    MOCK_JITTER_MS = args.jitter_ms
+    MOCK_ERROR_RATE = args.error_rate
+
+    print(f"[mock] JSON API on http://{args.host}:{args.port}/v1")
+    print(f"[mock] parties: {', '.join(_parties.values())}")
+    print(
+        f"[mock] latency {MOCK_LATENCY_MS}±{MOCK_JITTER_MS} ms,"
+        f" error rate {MOCK_ERROR_RATE}"
+    )
+    app.run(host=args.host, port=args.port, threaded=True)